@@ -7,11 +7,24 @@ providing intelligent knowledge base search capabilities.
 __version__ = "1.0.0"
 __author__ = "RAG Agent Team"
 
-# Core exports
-from .core.agent import search_agent
-from .core.fm_global_agent import fm_global_agent
-from .core.dependencies import AgentDependencies
-from .config.settings import load_settings
+# Core exports, resolved on first access so that importing a submodule
+# (e.g. the CLI) does not pull in pydantic_ai and the database stack.
+_EXPORTS = {
+    "search_agent": ".core.agent",
+    "fm_global_agent": ".core.fm_global_agent",
+    "AgentDependencies": ".core.dependencies",
+    "load_settings": ".config.settings",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "search_agent",
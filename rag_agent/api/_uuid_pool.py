@@ -0,0 +1,26 @@
+"""Batched random session ids for the API routers."""
+
+from collections import deque
+import os
+import uuid
+
+# Number of ids produced per os.urandom() call
+_BATCH_SIZE = 256
+
+_pool: deque = deque()
+
+
+def _refill():
+    """Read one batch of random bytes and slice it into 16-byte id seeds."""
+    raw = os.urandom(16 * _BATCH_SIZE)
+    _pool.extend(raw[i:i + 16] for i in range(0, len(raw), 16))
+
+
+def next_session_id() -> str:
+    """Return a new random (version 4) UUID string."""
+    try:
+        seed = _pool.popleft()
+    except IndexError:
+        _refill()
+        seed = _pool.popleft()
+    return str(uuid.UUID(bytes=seed, version=4))
@@ -13,7 +13,7 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-from ..core.agent import get_search_agent
+from ..core.agent import aget_search_agent
 from ..core.dependencies import AgentDependencies
 from ..config.settings import load_settings
 from pydantic_ai import Agent
@@ -87,7 +87,7 @@ Search the knowledge base to answer the user's question. Choose the appropriate
 
     try:
         # Get the agent and stream the execution
-        agent = get_search_agent()
+        agent = await aget_search_agent()
         async with agent.iter(prompt, deps=deps) as run:
             
             tool_calls = []
@@ -166,7 +166,7 @@ Search the knowledge base to answer the user's question. Choose the appropriate
     
     try:
         # Get the agent and run
-        agent = get_search_agent()
+        agent = await aget_search_agent()
         result = await agent.run(prompt, deps=deps)
         
         # Extract tool calls from result if available
@@ -232,8 +232,8 @@ async def health_check():
     if os.getenv('CHECK_EXTERNAL_CONNECTIONS', 'false').lower() == 'true':
         try:
             # Test LLM connection (lazy)
-            from ..core.agent import get_search_agent
-            agent = get_search_agent()
+            from ..core.agent import aget_search_agent
+            agent = await aget_search_agent()
             health_status["checks"]["llm_connection"] = True
         except Exception as e:
             health_status["checks"]["llm_connection"] = False
@@ -0,0 +1,104 @@
+"""Warm pool of AgentDependencies shared by the multi-agent routers."""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import logging
+import os
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+DEPS_POOL_SIZE = int(os.getenv("DEPS_POOL", 8))
+
+
+async def create_db_pool():
+    """Create the asyncpg pool shared by every pooled dependency; returns None if unavailable."""
+    import asyncpg
+    from ..config.settings import load_settings
+
+    try:
+        settings = load_settings()
+        return await asyncpg.create_pool(
+            settings.database_url,
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size
+        )
+    except Exception as e:
+        logger.warning(f"Shared database pool unavailable, dependencies will connect on their own: {e}")
+        return None
+
+
+async def _new_deps(session_id: Optional[str] = None, db_pool=None):
+    """Construct and initialize a fresh AgentDependencies, using db_pool when given."""
+    # Lazy import to avoid startup issues
+    from ..core.dependencies import AgentDependencies
+    from ..config.settings import load_settings
+
+    deps = AgentDependencies(settings=load_settings(), session_id=session_id, db_pool=db_pool)
+    try:
+        await deps.initialize()
+    except BaseException:
+        # Close whatever initialize() opened before it failed, but never the shared pool
+        if db_pool is None:
+            await deps.cleanup()
+        raise
+    return deps
+
+
+async def create_deps_pool(db_pool, size: int = DEPS_POOL_SIZE) -> Optional[asyncio.Queue]:
+    """
+    Pre-initialize size dependency objects sharing db_pool.
+
+    Returns None if there is no shared database pool or settings are
+    unavailable; handlers then fall back to per-request init.
+    """
+    if db_pool is None:
+        logger.warning("Dependencies pool disabled, falling back to per-request init: no shared database pool")
+        return None
+
+    pool: asyncio.Queue = asyncio.Queue()
+    try:
+        for _ in range(size):
+            pool.put_nowait(await _new_deps(db_pool=db_pool))
+    except Exception as e:
+        logger.warning(f"Dependencies pool disabled, falling back to per-request init: {e}")
+        await close_deps_pool(pool)
+        return None
+    return pool
+
+
+async def close_deps_pool(pool: Optional[asyncio.Queue], db_pool=None):
+    """Release every pooled dependency object, then close the shared database pool once."""
+    # Pooled deps own no connections of their own: the OpenAI client is
+    # shared process-wide and the database pool is closed here
+    while pool is not None and not pool.empty():
+        pool.get_nowait().db_pool = None
+    if db_pool is not None:
+        await db_pool.close()
+
+
+@asynccontextmanager
+async def pooled_deps(request: Request, session_id: str) -> AsyncIterator:
+    """Borrow initialized dependencies for one session and return them afterwards."""
+    pool: Optional[asyncio.Queue] = getattr(request.app.state, "deps_pool", None)
+    if pool is None:
+        db_pool = getattr(request.app.state, "db_pool", None)
+        deps = await _new_deps(session_id, db_pool)
+        try:
+            yield deps
+        finally:
+            # Only a pool this request opened itself is closed here
+            if db_pool is None:
+                await deps.cleanup()
+        return
+
+    deps = await pool.get()
+    deps.session_id = session_id
+    deps.user_preferences = {}
+    deps.query_history = []
+    try:
+        yield deps
+    finally:
+        pool.put_nowait(deps)
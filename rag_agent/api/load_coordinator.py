@@ -0,0 +1,48 @@
+"""In-process load table for the multi-agent routers.
+
+Each agent gets a concurrency cap; requests beyond the cap are rejected with a
+fast 503 instead of queueing behind a slow LLM call and starving the other
+agents of event-loop time.
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+import os
+
+from fastapi import HTTPException
+
+# Per-agent concurrency caps, overridable through the environment
+_caps: Dict[str, int] = {
+    "fm_global": int(os.getenv("FM_GLOBAL_MAX_CONCURRENCY", 16)),
+    "general": int(os.getenv("GENERAL_MAX_CONCURRENCY", 32)),
+    "code": int(os.getenv("CODE_MAX_CONCURRENCY", 32)),
+    "documents": int(os.getenv("DOCS_MAX_CONCURRENCY", 16)),
+}
+
+# Requests currently in flight per agent
+_active: Dict[str, int] = {agent: 0 for agent in _caps}
+
+
+@asynccontextmanager
+async def track(agent_name: str) -> AsyncIterator[None]:
+    """Hold a slot for agent_name for the duration of the block, or 503 if saturated."""
+    active = _active.get(agent_name, 0)
+    cap = _caps.get(agent_name)
+    if cap is not None and active >= cap:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Agent '{agent_name}' is at capacity, please retry shortly"
+        )
+    _active[agent_name] = active + 1
+    try:
+        yield
+    finally:
+        _active[agent_name] -= 1
+
+
+def get_load() -> Dict[str, Dict[str, int]]:
+    """Snapshot of in-flight requests and caps per agent."""
+    return {
+        agent: {"active": _active.get(agent, 0), "cap": cap}
+        for agent, cap in _caps.items()
+    }
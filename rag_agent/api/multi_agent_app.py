@@ -5,6 +5,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import uuid
 import os
 import logging
@@ -16,27 +18,89 @@ from .routers import (
     code_assistant_router,
     document_qa_router
 )
+from .load_coordinator import get_load
+from .deps_pool import create_db_pool, create_deps_pool, close_deps_pool
+from .request_metrics import MetricsMiddleware, RequestMetrics
+
+try:
+    import psutil
+except ImportError:
+    # Optional: without it the CPU sampler is skipped and reported CPU stays 0.0
+    psutil = None
 
 logger = logging.getLogger(__name__)
 
+# Last sampled CPU percentage, refreshed in the background by _cpu_sampler
+CPU_SAMPLE_INTERVAL = 5.0
+_cpu_cache: float = 0.0
+
+
+async def _cpu_sampler():
+    """Refresh the cached CPU percentage without blocking request handlers."""
+    global _cpu_cache
+    while True:
+        await asyncio.sleep(CPU_SAMPLE_INTERVAL)
+        _cpu_cache = psutil.cpu_percent(interval=None)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background samplers and the dependencies pool; tear them down on shutdown."""
+    sampler = None
+    if psutil is not None:
+        # The first non-blocking call only primes psutil's counters
+        psutil.cpu_percent(interval=None)
+        sampler = asyncio.create_task(_cpu_sampler())
+    # Pre-initialized dependencies reused across chat requests, all sharing
+    # one database pool instead of opening one each
+    app.state.db_pool = await create_db_pool()
+    app.state.deps_pool = await create_deps_pool(app.state.db_pool)
+    try:
+        yield
+    finally:
+        if sampler is not None:
+            sampler.cancel()
+            with suppress(asyncio.CancelledError):
+                await sampler
+        await close_deps_pool(app.state.deps_pool, app.state.db_pool)
+        # Lazy import to avoid startup issues
+        from ..core.dependencies import close_shared_clients
+        await close_shared_clients()
+
 # Create main FastAPI app
 app = FastAPI(
     title="Multi-Agent RAG Platform",
     version="2.0.0",
-    description="Unified platform hosting multiple specialized RAG agents"
+    description="Unified platform hosting multiple specialized RAG agents",
+    lifespan=lifespan
 )
 
-# Configure CORS
+# Real request counters, updated by MetricsMiddleware on every request
+app.state.metrics = RequestMetrics()
+app.add_middleware(MetricsMiddleware)
+
+# Configure CORS with an explicit allow-list. A literal "*" combined with
+# credentials forces Starlette to echo the Origin on every request, so a
+# wildcard FRONTEND_URL disables credentials instead. Any other deployed
+# frontend must be listed in FRONTEND_URL.
+frontend_url = os.getenv("FRONTEND_URL")
+cors_origins = [
+    origin for origin in [
+        "http://localhost:3000",
+        "http://localhost:3001",
+        frontend_url
+    ]
+    if origin and origin != "*"
+]
+# allow_origins compares exactly, so hosted preview domains need a pattern
+CORS_ORIGIN_REGEX = r"https://.*\.(vercel\.app|render\.com)"
+allow_any_origin = frontend_url == "*"
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:3001", 
-        "https://*.vercel.app",
-        "https://*.render.com",
-        os.getenv("FRONTEND_URL", "*")
-    ],
-    allow_credentials=True,
+    allow_origins=["*"] if allow_any_origin else cors_origins,
+    allow_origin_regex=None if allow_any_origin else CORS_ORIGIN_REGEX,
+    allow_credentials=not allow_any_origin,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -219,12 +283,8 @@ async def get_metrics():
     return {
         "total_requests": get_total_requests(),
         "active_sessions": get_active_sessions(),
-        "agent_usage": {
-            "fm_global": {"requests": 1250, "avg_response_time": 1.2},
-            "general": {"requests": 3400, "avg_response_time": 0.8},
-            "code": {"requests": 890, "avg_response_time": 1.5},
-            "documents": {"requests": 567, "avg_response_time": 2.1}
-        },
+        "agent_usage": app.state.metrics.agent_usage(),
+        "agent_load": get_load(),
         "resource_usage": {
             "memory_mb": get_memory_usage(),
             "cpu_percent": get_cpu_usage()
@@ -233,13 +293,11 @@ async def get_metrics():
 
 def get_total_requests() -> int:
     """Get total requests across all agents."""
-    # Implement request counting logic
-    return 6107  # Placeholder
+    return app.state.metrics.total_requests
 
 def get_active_sessions() -> int:
-    """Get number of active sessions."""
-    # Implement session counting logic
-    return 42  # Placeholder
+    """Get number of requests currently being served."""
+    return app.state.metrics.in_flight
 
 def get_memory_usage() -> float:
     """Get current memory usage in MB."""
@@ -248,11 +306,17 @@ def get_memory_usage() -> float:
     return process.memory_info().rss / 1024 / 1024
 
 def get_cpu_usage() -> float:
-    """Get current CPU usage percentage."""
-    import psutil
-    return psutil.cpu_percent(interval=1)
+    """Get the most recently sampled CPU usage percentage."""
+    return _cpu_cache
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    uvicorn.run(
+        "rag_agent.api.multi_agent_app:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", 1))
+    )
\ No newline at end of file
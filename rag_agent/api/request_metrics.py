@@ -0,0 +1,76 @@
+"""In-memory request metrics for the multi-agent platform."""
+
+from collections import Counter, defaultdict, deque
+from typing import Deque, Dict, Optional
+import statistics
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+# Key for requests that matched no route, so unknown URLs cannot grow the counters
+UNMATCHED_PATH = "other"
+
+# Route prefix -> agent id, matching the routers mounted in multi_agent_app
+AGENT_PREFIXES: Dict[str, str] = {
+    "/api/fm-global": "fm_global",
+    "/api/general": "general",
+    "/api/code": "code",
+    "/api/documents": "documents",
+}
+
+
+def agent_for_path(path: str) -> Optional[str]:
+    """Return the agent id serving path, if any."""
+    for prefix, agent in AGENT_PREFIXES.items():
+        if path.startswith(prefix):
+            return agent
+    return None
+
+
+class RequestMetrics:
+    """Request counters and rolling response-time windows, kept on app.state."""
+
+    def __init__(self, window: int = 1000):
+        self.path_counts: Counter = Counter()
+        self.agent_counts: Counter = Counter()
+        self.durations: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self.in_flight = 0
+
+    def record(self, path: str, duration: float):
+        """Count a finished request and its duration, keyed by route template."""
+        self.path_counts[path] += 1
+        agent = agent_for_path(path)
+        if agent:
+            self.agent_counts[agent] += 1
+            self.durations[agent].append(duration)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.path_counts.values())
+
+    def agent_usage(self) -> Dict[str, Dict[str, float]]:
+        """Requests and average response time (seconds) per agent."""
+        usage = {}
+        for agent in AGENT_PREFIXES.values():
+            window = self.durations.get(agent)
+            usage[agent] = {
+                "requests": self.agent_counts[agent],
+                "avg_response_time": round(statistics.mean(window), 3) if window else 0.0
+            }
+        return usage
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """Record every request into app.state.metrics."""
+
+    async def dispatch(self, request: Request, call_next):
+        metrics: RequestMetrics = request.app.state.metrics
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await call_next(request)
+        finally:
+            metrics.in_flight -= 1
+            route = request.scope.get("route")
+            metrics.record(route.path if route is not None else UNMATCHED_PATH, time.perf_counter() - start)
@@ -3,7 +3,9 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Optional, Literal
-import uuid
+
+from .._uuid_pool import next_session_id
+from ..load_coordinator import track
 
 router = APIRouter()
 
@@ -31,9 +33,10 @@ async def code_info():
 @router.post("/chat")
 async def code_chat(query: CodeQuery):
     """Code assistant chat endpoint."""
-    # Placeholder - implement your code assistant logic here
-    return {
-        "response": f"Code assistance for: {query.query}",
-        "session_id": str(uuid.uuid4()),
-        "language": query.language
-    }
\ No newline at end of file
+    async with track("code"):
+        # Placeholder - implement your code assistant logic here
+        return {
+            "response": f"Code assistance for: {query.query}",
+            "session_id": next_session_id(),
+            "language": query.language
+        }
\ No newline at end of file
@@ -3,7 +3,9 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File
 from pydantic import BaseModel
 from typing import List, Optional
-import uuid
+
+from .._uuid_pool import next_session_id
+from ..load_coordinator import track
 
 router = APIRouter()
 
@@ -29,19 +31,20 @@ async def document_info():
 @router.post("/chat")
 async def document_chat(query: DocumentQuery):
     """Document Q&A chat endpoint."""
-    # Placeholder - implement your document Q&A logic here
-    return {
-        "response": f"Document analysis for: {query.query}",
-        "session_id": str(uuid.uuid4()),
-        "documents_searched": len(query.document_ids)
-    }
+    async with track("documents"):
+        # Placeholder - implement your document Q&A logic here
+        return {
+            "response": f"Document analysis for: {query.query}",
+            "session_id": next_session_id(),
+            "documents_searched": len(query.document_ids)
+        }
 
 @router.post("/upload")
 async def upload_document(file: UploadFile = File(...)):
     """Upload a document for analysis."""
     # Placeholder - implement document upload logic
     return {
-        "document_id": str(uuid.uuid4()),
+        "document_id": next_session_id(),
         "filename": file.filename,
         "status": "uploaded"
     }
\ No newline at end of file
@@ -1,16 +1,40 @@
 """FM Global 8-34 ASRS Expert Router."""
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
-import uuid
+from typing import List, Optional, Tuple
+import asyncio
+import re
 import logging
 
+from .._uuid_pool import next_session_id
+from ..deps_pool import pooled_deps
+from ..load_coordinator import track
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Reference patterns scanned over every agent response
+TABLE_PATTERN = re.compile(r'Table\s+[\d\-\.]+', re.IGNORECASE)
+FIGURE_PATTERN = re.compile(r'Figure\s+[\d\-\.]+', re.IGNORECASE)
+COST_PATTERN = re.compile(r'\$[\d,]+(?:\.\d{2})?')
+
+# Responses longer than this are scanned off the event loop
+INLINE_EXTRACTION_LIMIT = 512
+
+
+def _extract_refs(text: str) -> Tuple[List[str], List[str], Optional[float]]:
+    """Extract table references, figure references and the first cost figure."""
+    if not text:
+        return [], [], None
+    tables = list(set(TABLE_PATTERN.findall(text)))
+    figures = list(set(FIGURE_PATTERN.findall(text)))
+    cost_match = COST_PATTERN.search(text)
+    cost_estimate = float(cost_match.group().replace('$', '').replace(',', '')) if cost_match else None
+    return tables, figures, cost_estimate
+
 class FMGlobalQuery(BaseModel):
     """Request model for FM Global queries."""
     query: str
@@ -41,27 +65,20 @@ async def fm_global_info():
     }
 
 @router.post("/chat", response_model=FMGlobalResponse)
-async def fm_global_chat(query: FMGlobalQuery):
+async def fm_global_chat(query: FMGlobalQuery, request: Request):
     """FM Global ASRS expert chat endpoint."""
-    session_id = str(uuid.uuid4())
+    async with track("fm_global"):
+        session_id = next_session_id()
     
-    try:
-        # Lazy import to avoid startup issues
-        from ...core.fm_global_agent import get_fm_global_agent
-        from ...core.dependencies import AgentDependencies
-        from ...config.settings import load_settings
-        
-        settings = load_settings()
-        agent = get_fm_global_agent()
+        try:
+            # Lazy import to avoid startup issues
+            from ...core.fm_global_agent import get_fm_global_agent
+            from ...core.fm_global_prompts import prompt_cache_settings
         
-        deps = AgentDependencies(
-            settings=settings,
-            session_id=session_id
-        )
-        await deps.initialize()
+            agent = get_fm_global_agent()
         
-        # Build specialized prompt
-        prompt = f"""As an FM Global 8-34 ASRS expert:
+            # Build specialized prompt
+            prompt = f"""As an FM Global 8-34 ASRS expert:
 Topic Focus: {query.asrs_topic or 'general'}
 Design Focus: {query.design_focus or 'compliance'}
 
@@ -69,61 +86,54 @@ Question: {query.query}
 
 Provide specific guidance with table/figure references and cost implications."""
         
-        result = await agent.run(prompt, deps=deps)
-        response_text = str(result.response) if hasattr(result, 'response') else str(result)
+            async with pooled_deps(request, session_id) as deps:
+                result = await agent.run(prompt, deps=deps, model_settings=prompt_cache_settings())
+            response_text = str(result.response) if hasattr(result, 'response') else str(result)
         
-        # Extract references
-        import re
-        tables = re.findall(r'Table\s+[\d\-\.]+', response_text, re.IGNORECASE)
-        figures = re.findall(r'Figure\s+[\d\-\.]+', response_text, re.IGNORECASE)
+            # Extract table/figure references and cost; long responses are
+            # scanned in a worker thread so the event loop stays responsive
+            if len(response_text) > INLINE_EXTRACTION_LIMIT:
+                tables, figures, cost_estimate = await asyncio.to_thread(_extract_refs, response_text)
+            else:
+                tables, figures, cost_estimate = _extract_refs(response_text)
         
-        # Extract cost if mentioned
-        cost_match = re.search(r'\$[\d,]+(?:\.\d{2})?', response_text)
-        cost_estimate = float(cost_match.group().replace('$', '').replace(',', '')) if cost_match else None
+            return ORJSONResponse(FMGlobalResponse(
+                response=response_text,
+                session_id=session_id,
+                tables_referenced=tables,
+                figures_referenced=figures,
+                cost_estimate=cost_estimate
+            ).model_dump(mode="json"))
         
-        return FMGlobalResponse(
-            response=response_text,
-            session_id=session_id,
-            tables_referenced=list(set(tables)),
-            figures_referenced=list(set(figures)),
-            cost_estimate=cost_estimate
-        )
-        
-    except Exception as e:
-        logger.error(f"FM Global agent error: {e}")
-        # Return fallback response
-        return FMGlobalResponse(
-            response=get_fm_fallback_response(query.query),
-            session_id=session_id,
-            tables_referenced=[],
-            figures_referenced=[]
-        )
+        except Exception as e:
+            logger.error(f"FM Global agent error: {e}")
+            # Return fallback response
+            return ORJSONResponse(FMGlobalResponse(
+                response=get_fm_fallback_response(query.query),
+                session_id=session_id,
+                tables_referenced=[],
+                figures_referenced=[]
+            ).model_dump(mode="json"))
 
 @router.post("/chat/stream")
-async def fm_global_stream(query: FMGlobalQuery):
+async def fm_global_stream(query: FMGlobalQuery, request: Request):
     """Streaming endpoint for FM Global agent."""
-    session_id = str(uuid.uuid4())
+    session_id = next_session_id()
     
     async def generate():
         try:
             from ...core.fm_global_agent import get_fm_global_agent
-            from ...core.dependencies import AgentDependencies
-            from ...config.settings import load_settings
+            from ...core.fm_global_prompts import prompt_cache_settings
             
-            settings = load_settings()
             agent = get_fm_global_agent()
-            deps = AgentDependencies(
-                settings=settings,
-                session_id=session_id
-            )
-            await deps.initialize()
             
             prompt = f"FM Global ASRS Expert Query: {query.query}"
             
-            async with agent.iter(prompt, deps=deps) as run:
-                async for chunk in run:
-                    if hasattr(chunk, 'delta'):
-                        yield f"data: {chunk.delta}\n\n"
+            async with pooled_deps(request, session_id) as deps:
+                async with agent.iter(prompt, deps=deps, model_settings=prompt_cache_settings()) as run:
+                    async for chunk in run:
+                        if hasattr(chunk, 'delta'):
+                            yield f"data: {chunk.delta}\n\n"
                         
         except Exception as e:
             yield f"data: Error: {str(e)}\n\n"
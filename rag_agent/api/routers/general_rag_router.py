@@ -1,16 +1,29 @@
 """General RAG Agent Router."""
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Literal
-import uuid
+from typing import Any, List, Optional, Literal, Tuple
+from collections import OrderedDict
 import logging
+import os
+import time
+
+from .._uuid_pool import next_session_id
+from ..deps_pool import pooled_deps
+from ..load_coordinator import track
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Recent direct-search results keyed by (query, max_results, strategy), stored
+# with their monotonic fetch time; entries older than the TTL are refetched so
+# newly ingested documents show up
+SEARCH_CACHE_SIZE = 128
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 60))
+_search_cache: "OrderedDict[Tuple[str, Optional[int], str], Tuple[float, Any]]" = OrderedDict()
+
 class GeneralQuery(BaseModel):
     """Request model for general RAG queries."""
     query: str
@@ -41,79 +54,65 @@ async def general_info():
     }
 
 @router.post("/chat", response_model=GeneralResponse)
-async def general_chat(query: GeneralQuery):
+async def general_chat(query: GeneralQuery, request: Request):
     """General RAG chat endpoint."""
-    session_id = str(uuid.uuid4())
+    async with track("general"):
+        session_id = next_session_id()
     
-    try:
-        from ...core.agent import get_search_agent
-        from ...core.dependencies import AgentDependencies
-        from ...config.settings import load_settings
-        
-        settings = load_settings()
-        agent = get_search_agent()
+        try:
+            from ...core.agent import aget_search_agent
         
-        deps = AgentDependencies(
-            api_key=settings.llm_api_key,
-            session_id=session_id,
-            agent_type="general"
-        )
+            agent = await aget_search_agent()
         
-        # Build prompt with search strategy hint
-        strategy_hint = ""
-        if query.search_strategy != "auto":
-            strategy_hint = f"Use {query.search_strategy} search strategy. "
+            # Build prompt with search strategy hint
+            strategy_hint = ""
+            if query.search_strategy != "auto":
+                strategy_hint = f"Use {query.search_strategy} search strategy. "
         
-        prompt = f"""{strategy_hint}Search the knowledge base to answer: {query.query}
+            prompt = f"""{strategy_hint}Search the knowledge base to answer: {query.query}
         
 Return up to {query.max_results} relevant results."""
         
-        result = await agent.run(prompt, deps=deps)
-        response_text = str(result.response) if hasattr(result, 'response') else str(result)
+            async with pooled_deps(request, session_id) as deps:
+                result = await agent.run(prompt, deps=deps)
+            response_text = str(result.response) if hasattr(result, 'response') else str(result)
         
-        # Determine which strategy was used (from response or tool calls)
-        strategy_used = query.search_strategy
-        if hasattr(result, '_tool_calls'):
-            for tc in result._tool_calls:
-                if 'semantic' in tc.name:
-                    strategy_used = 'semantic'
-                elif 'hybrid' in tc.name:
-                    strategy_used = 'hybrid'
+            # Determine which strategy was used (from response or tool calls)
+            strategy_used = query.search_strategy
+            if hasattr(result, '_tool_calls'):
+                for tc in result._tool_calls:
+                    if 'semantic' in tc.name:
+                        strategy_used = 'semantic'
+                    elif 'hybrid' in tc.name:
+                        strategy_used = 'hybrid'
         
-        return GeneralResponse(
-            response=response_text,
-            session_id=session_id,
-            search_strategy_used=strategy_used,
-            sources=[]  # Could extract from tool results
-        )
+            return ORJSONResponse(GeneralResponse(
+                response=response_text,
+                session_id=session_id,
+                search_strategy_used=strategy_used,
+                sources=[]  # Could extract from tool results
+            ).model_dump(mode="json"))
         
-    except Exception as e:
-        logger.error(f"General RAG agent error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        except Exception as e:
+            logger.error(f"General RAG agent error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/chat/stream")
-async def general_stream(query: GeneralQuery):
+async def general_stream(query: GeneralQuery, request: Request):
     """Streaming endpoint for General RAG agent."""
-    session_id = str(uuid.uuid4())
+    session_id = next_session_id()
     
     async def generate():
         try:
-            from ...core.agent import get_search_agent
-            from ...core.dependencies import AgentDependencies
-            from ...config.settings import load_settings
+            from ...core.agent import aget_search_agent
             
-            settings = load_settings()
-            agent = get_search_agent()
-            deps = AgentDependencies(
-                api_key=settings.llm_api_key,
-                session_id=session_id,
-                agent_type="general"
-            )
+            agent = await aget_search_agent()
             
-            async with agent.iter(query.query, deps=deps) as run:
-                async for chunk in run:
-                    if hasattr(chunk, 'delta'):
-                        yield f"data: {chunk.delta}\n\n"
+            async with pooled_deps(request, session_id) as deps:
+                async with agent.iter(query.query, deps=deps) as run:
+                    async for chunk in run:
+                        if hasattr(chunk, 'delta'):
+                            yield f"data: {chunk.delta}\n\n"
                         
         except Exception as e:
             yield f"data: Error: {str(e)}\n\n"
@@ -121,30 +120,32 @@ async def general_stream(query: GeneralQuery):
     return StreamingResponse(generate(), media_type="text/event-stream")
 
 @router.post("/search")
-async def direct_search(query: GeneralQuery):
+async def direct_search(query: GeneralQuery, request: Request):
     """Direct search without LLM processing."""
     try:
         from ...tools.tools import semantic_search, hybrid_search
-        from ...core.dependencies import AgentDependencies
-        from ...config.settings import load_settings
         
-        settings = load_settings()
-        deps = AgentDependencies(
-            api_key=settings.llm_api_key,
-            session_id=str(uuid.uuid4())
-        )
+        # Choose search function; auto picks semantic for more than five words
+        strategy = query.search_strategy
+        if strategy not in ("semantic", "hybrid"):
+            strategy = "semantic" if query.query.count(" ") >= 5 else "hybrid"
         
-        # Choose search function
-        if query.search_strategy == "semantic":
-            results = await semantic_search(deps, query.query, query.max_results)
-        elif query.search_strategy == "hybrid":
-            results = await hybrid_search(deps, query.query, query.max_results)
+        cache_key = (query.query, query.max_results, strategy)
+        now = time.monotonic()
+        cached = _search_cache.get(cache_key)
+        if cached is not None and now - cached[0] < SEARCH_CACHE_TTL:
+            results = cached[1]
+            _search_cache.move_to_end(cache_key)
         else:
-            # Auto-select based on query characteristics
-            if len(query.query.split()) > 5:
-                results = await semantic_search(deps, query.query, query.max_results)
-            else:
-                results = await hybrid_search(deps, query.query, query.max_results)
+            # Expired entries are dropped and refetched
+            _search_cache.pop(cache_key, None)
+            search = semantic_search if strategy == "semantic" else hybrid_search
+            async with pooled_deps(request, next_session_id()) as deps:
+                results = await search(deps, query.query, query.max_results)
+            
+            _search_cache[cache_key] = (now, results)
+            if len(_search_cache) > SEARCH_CACHE_SIZE:
+                _search_cache.popitem(last=False)
         
         return {
             "query": query.query,
@@ -3,43 +3,192 @@
 
 import asyncio
 import sys
+import threading
+import time
 import uuid
-from typing import List
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING, Deque, List
 
 from rich.console import Console
+from rich.text import Text
 from rich.panel import Panel
-from rich.prompt import Prompt
-from rich.markdown import Markdown
 
-from pydantic_ai import Agent
-from ..core.fm_global_agent import get_fm_global_agent
-from ..core.dependencies import AgentDependencies
 from ..config.settings import load_settings
 
+# Markdown/Prompt, pydantic_ai and the agent stack are imported on first use
+# so that startup and help/info/exit stay fast.
+if TYPE_CHECKING:
+    from rich.markdown import Markdown
+    from ..core.dependencies import AgentDependencies
+
 console = Console()
 
+# User-friendly descriptions for tool-call events
+_TOOL_DESCRIPTIONS = {
+    'hybrid_search_fm_global': '🔍 Searching FM Global 8-34 database',
+    'semantic_search_fm_global': '🧠 Performing semantic search of FM Global content',
+    'get_fm_global_references': '📋 Finding relevant tables and figures',
+    'asrs_design_search': '🏗️ Comprehensive ASRS design analysis'
+}
+
+# Style for dim status lines printed between streamed output
+_STATUS_STYLE = "dim italic"
+
+# Assistant prefix, parsed from markup once
+_EXPERT_PREFIX = Text.from_markup("[bold blue]🏭 FM Global Expert:[/bold blue] ")
+
+# Static per-turn instructions, sent ahead of the rolling history
+_EXPERT_INSTRUCTIONS = (
+    "As an FM Global 8-34 ASRS expert, search the knowledge base and provide a comprehensive "
+    "answer with specific table and figure references. Focus on practical guidance for ASRS "
+    "fire protection design and cost optimization opportunities."
+)
+
+# History entries included in each prompt as recent context
+RECENT_CONTEXT_ENTRIES = 6
+
+# Streamed text is written in small batches rather than per token
+STREAM_FLUSH_CHARS = 32
+STREAM_FLUSH_INTERVAL = 0.03
+
+_BANNER_TEXT = (
+    "FM Global 8-34 ASRS Expert System\n"
+    "Automated Storage & Retrieval Systems Fire Protection Expert\n"
+    "Type 'exit' to quit, 'help' for commands"
+)
+
+_HELP_TEXT = """
+**FM Global 8-34 ASRS Expert Commands:**
+
+• **help** - Show this help message
+• **info** - Display system configuration
+• **clear** - Clear the screen
+• **mode** - Switch conversation mode (expert/guided/standard)
+• **exit/quit** - Exit the application
+
+**Example Questions:**
+• "What are the aisle width requirements for Class IV commodities?"
+• "Show me Table 2-1 spacing requirements"
+• "How can I reduce sprinkler system costs while maintaining compliance?"
+• "What seismic bracing is required for high-rise racks?"
+• "Find Figure 3-2 crane fire protection details"
+
+**ASRS Topics Available:**
+• Fire protection systems and sprinkler design
+• Rack structural requirements and spacing
+• Seismic design and bracing requirements
+• Crane/SRM fire protection systems
+• Storage classification and commodity types
+• Cost optimization strategies
+"""
+
+@lru_cache(maxsize=1)
+def _help_markdown() -> "Markdown":
+    """Render the help text once; it never changes during a session."""
+    from rich.markdown import Markdown
+    return Markdown(_HELP_TEXT)
+
+
+def _info_text(provider: str, model: str) -> str:
+    """System information text for the given provider/model."""
+    return f"""
+**System Information:**
+• **Provider**: {provider}
+• **Model**: {model}
+• **Database**: FM Global 8-34 Specialized Tables
+• **Search**: Hybrid semantic + text search
+• **Status**: Connected and ready
+"""
+
 
-async def stream_fm_global_interaction(user_input: str, conversation_history: List[str], deps: AgentDependencies, prompt_mode: str = None) -> tuple[str, str]:
-    """Stream FM Global agent interaction with real-time tool call display."""
+@lru_cache(maxsize=8)
+def _render_info(provider: str, model: str) -> "Markdown":
+    """Build the system information panel for the given provider/model."""
+    from rich.markdown import Markdown
+    return Markdown(_info_text(provider, model))
+
+
+async def _ask(prompt: str, **kwargs) -> str:
+    """Prompt.ask on a daemon thread so the event loop keeps running while the user types.
+    
+    A daemon thread (rather than asyncio.to_thread) lets Ctrl+C exit
+    immediately instead of waiting for the pending stdin read.
+    """
+    from rich.prompt import Prompt
+    
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def resolve(setter, value):
+        if not future.done():
+            setter(value)
+    
+    def read():
+        try:
+            answer = Prompt.ask(prompt, **kwargs)
+        except BaseException as e:
+            loop.call_soon_threadsafe(resolve, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, answer)
+    
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+async def _print_result_count(count: int):
+    """Print a tool-result confirmation once the streaming loop yields."""
+    await asyncio.sleep(0)
+    console.print(f"Found {count} relevant results", style=_STATUS_STYLE)
+
+
+async def stream_fm_global_interaction(user_input: str, context: str, deps: "AgentDependencies", prompt_mode: str = None) -> tuple[str, str]:
+    """Stream FM Global agent interaction with real-time tool call display.
+    
+    context is the pre-joined recent conversation, maintained by the caller.
+    """
+    
+    from pydantic_ai import Agent
+    from ..core.fm_global_agent import get_fm_global_agent
+    from ..core.fm_global_prompts import prompt_cache_settings
     
     try:
-        # Build context with conversation history
-        context = "\n".join(conversation_history[-6:]) if conversation_history else ""
-        
-        prompt = f"""Previous conversation:
-{context}
+        # Static block first so the cacheable prefix is as long as possible
+        prompt = f"""{_EXPERT_INSTRUCTIONS}
 
-User: {user_input}
+Previous conversation:
+{context}
 
-As an FM Global 8-34 ASRS expert, search the knowledge base and provide a comprehensive answer with specific table and figure references. Focus on practical guidance for ASRS fire protection design and cost optimization opportunities."""
+User: {user_input}"""
 
         # Get agent with specified mode
         agent = get_fm_global_agent(mode=prompt_mode)
         
         # Stream the agent execution
-        async with agent.iter(prompt, deps=deps) as run:
+        async with agent.iter(prompt, deps=deps, model_settings=prompt_cache_settings(prompt_mode, suffix=_EXPERT_INSTRUCTIONS)) as run:
+            
+            # Streamed deltas, joined once at the end instead of growing a string
+            parts: List[str] = []
+            prev_len = 0
             
-            response_text = ""
+            # Deltas not yet written to the terminal
+            pending: List[str] = []
+            pending_len = 0
+            last_flush = time.monotonic()
+            
+            # Diagnostic prints scheduled off the streaming path
+            status_tasks: List[asyncio.Task] = []
+            
+            def flush_pending():
+                nonlocal pending_len, last_flush
+                if pending:
+                    # Raw write: the response body needs no Rich markup parsing
+                    console.file.write("".join(pending))
+                    console.file.flush()
+                    pending.clear()
+                    pending_len = 0
+                last_flush = time.monotonic()
             
             async for node in run:
                 
@@ -49,39 +198,48 @@ As an FM Global 8-34 ASRS expert, search the knowledge base and provide a compre
                 
                 # Handle model request node - stream the thinking process
                 elif Agent.is_model_request_node(node):
+                    flush_pending()
                     # Show assistant prefix at the start
-                    console.print("[bold blue]🏭 FM Global Expert:[/bold blue] ", end="")
+                    console.print(_EXPERT_PREFIX, end="")
                 
                 # Handle model response node - stream response text
                 elif Agent.is_model_response_node(node):
-                    response_chunk = node.data.content[len(response_text):]
-                    console.print(response_chunk, end="", flush=True)
-                    response_text += response_chunk
+                    full = node.data.content
+                    if len(full) > prev_len:
+                        response_chunk = full[prev_len:]
+                        parts.append(response_chunk)
+                        pending.append(response_chunk)
+                        pending_len += len(response_chunk)
+                        prev_len = len(full)
+                        if (pending_len >= STREAM_FLUSH_CHARS
+                                or time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL):
+                            flush_pending()
                 
                 # Handle tool call node - show what tools are being used
                 elif Agent.is_tool_call_node(node):
+                    flush_pending()
                     tool_name = node.data.tool_name
-                    # Show user-friendly tool descriptions
-                    tool_descriptions = {
-                        'hybrid_search_fm_global': '🔍 Searching FM Global 8-34 database',
-                        'semantic_search_fm_global': '🧠 Performing semantic search of FM Global content',
-                        'get_fm_global_references': '📋 Finding relevant tables and figures',
-                        'asrs_design_search': '🏗️ Comprehensive ASRS design analysis'
-                    }
-                    description = tool_descriptions.get(tool_name, f'Using {tool_name}')
+                    description = _TOOL_DESCRIPTIONS.get(tool_name, f'Using {tool_name}')
                     console.print(f"\n[dim italic]{description}...[/dim italic]")
                 
                 # Handle tool result node - optionally show results
                 elif Agent.is_tool_result_node(node):
+                    flush_pending()
                     # Show brief confirmation of results found
-                    if hasattr(node.data, 'data') and node.data.data:
-                        if isinstance(node.data.data, list) and len(node.data.data) > 0:
-                            console.print(f"[dim italic]Found {len(node.data.data)} relevant results[/dim italic]")
+                    try:
+                        result_count = len(getattr(node.data, 'data', None))
+                    except TypeError:
+                        result_count = 0
+                    if result_count:
+                        status_tasks.append(asyncio.create_task(_print_result_count(result_count)))
+            
+            await asyncio.gather(*status_tasks)
+            flush_pending()
             
             # Add final newline
             console.print("\n")
             
-            return response_text, "success"
+            return "".join(parts), "success"
             
     except Exception as e:
         error_msg = f"Error during FM Global search: {str(e)}"
@@ -89,25 +247,48 @@ As an FM Global 8-34 ASRS expert, search the knowledge base and provide a compre
         return "", error_msg
 
 
+async def _warmup(deps: "AgentDependencies"):
+    """Open the provider connection (TCP/TLS) before the first question needs it.
+    
+    initialize() only builds the shared OpenAI client; the database pool is
+    still created on first use.
+    """
+    await deps.initialize()
+    await deps.get_embedding(" ")
+
+
 async def main():
     """Main CLI function for FM Global Expert."""
+    from ..core.dependencies import AgentDependencies
+    
+    # Line-buffered stdout: complete lines go out on their own and the
+    # streamed body is flushed explicitly in batches, never per token
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(line_buffering=True)
     
     try:
         # Load settings
         settings = load_settings()
         
-        # Initialize dependencies
+        # Dependencies are initialized on the first real query; commands
+        # (help/info/clear/mode/exit) never wait for them
         deps = AgentDependencies(settings=settings)
-        await deps.initialize()
+        initialized = False
+        
+        # Warm up the provider while the banner prints and the user reads
+        warmup = asyncio.create_task(_warmup(deps))
         
-        # Display banner
-        console.print(Panel.fit(
-            "[bold blue]FM Global 8-34 ASRS Expert System[/bold blue]\n\n"
-            "[white]Automated Storage & Retrieval Systems Fire Protection Expert[/white]\n"
-            "[dim]Ask about FM Global 8-34 requirements, ASRS design, and cost optimization[/dim]\n\n"
-            "[dim]Type 'exit' to quit, 'help' for commands[/dim]",
-            border_style="blue"
-        ))
+        # Display banner; plain text when output is piped or captured
+        if console.is_terminal:
+            console.print(Panel.fit(
+                "[bold blue]FM Global 8-34 ASRS Expert System[/bold blue]\n\n"
+                "[white]Automated Storage & Retrieval Systems Fire Protection Expert[/white]\n"
+                "[dim]Ask about FM Global 8-34 requirements, ASRS design, and cost optimization[/dim]\n\n"
+                "[dim]Type 'exit' to quit, 'help' for commands[/dim]",
+                border_style="blue"
+            ))
+        else:
+            console.out(_BANNER_TEXT, highlight=False)
         
         # Ask for prompt mode preference
         console.print("\n[bold yellow]Select conversation mode:[/bold yellow]")
@@ -115,7 +296,7 @@ async def main():
         console.print("2. [bold]Guided Mode[/bold] - Step-by-step design process")
         console.print("3. [bold]Standard Mode[/bold] - Comprehensive consulting approach\n")
         
-        mode_choice = Prompt.ask("[bold green]Enter mode (1/2/3)[/bold green]", default="1")
+        mode_choice = await _ask("[bold green]Enter mode (1/2/3)[/bold green]", default="1")
         
         prompt_mode = None  # Default
         if mode_choice == "1":
@@ -127,72 +308,50 @@ async def main():
         else:
             console.print("[green]✓ Standard Consulting Mode activated[/green]\n")
         
-        conversation_history = []
+        # Bounded history: the deque drops the oldest entries itself
+        conversation_history: Deque[str] = deque(maxlen=20)
+        # Last few history entries, re-joined only when the history changes
+        recent_context = ""
         
         while True:
             try:
                 # Get user input
-                user_input = Prompt.ask("\n[bold green]Ask FM Global Expert[/bold green]").strip()
+                user_input = (await _ask("\n[bold green]Ask FM Global Expert[/bold green]")).strip()
                 
                 if not user_input:
                     continue
                 
                 # Handle commands
-                if user_input.lower() in ['exit', 'quit', 'q']:
+                cmd = user_input.lower()
+                if cmd in {'exit', 'quit', 'q'}:
                     console.print("[yellow]Thank you for using FM Global 8-34 ASRS Expert![/yellow]")
                     break
                 
-                elif user_input.lower() == 'help':
-                    help_text = """
-**FM Global 8-34 ASRS Expert Commands:**
-
-• **help** - Show this help message
-• **info** - Display system configuration
-• **clear** - Clear the screen
-• **mode** - Switch conversation mode (expert/guided/standard)
-• **exit/quit** - Exit the application
-
-**Example Questions:**
-• "What are the aisle width requirements for Class IV commodities?"
-• "Show me Table 2-1 spacing requirements"
-• "How can I reduce sprinkler system costs while maintaining compliance?"
-• "What seismic bracing is required for high-rise racks?"
-• "Find Figure 3-2 crane fire protection details"
-
-**ASRS Topics Available:**
-• Fire protection systems and sprinkler design
-• Rack structural requirements and spacing
-• Seismic design and bracing requirements
-• Crane/SRM fire protection systems
-• Storage classification and commodity types
-• Cost optimization strategies
-                    """
-                    console.print(Markdown(help_text))
+                elif cmd == 'help':
+                    if console.is_terminal:
+                        console.print(_help_markdown())
+                    else:
+                        console.out(_HELP_TEXT, highlight=False)
                     continue
                 
-                elif user_input.lower() == 'info':
-                    info_text = f"""
-**System Information:**
-• **Provider**: {settings.llm_provider}
-• **Model**: {settings.llm_model}
-• **Database**: FM Global 8-34 Specialized Tables
-• **Search**: Hybrid semantic + text search
-• **Status**: Connected and ready
-                    """
-                    console.print(Markdown(info_text))
+                elif cmd == 'info':
+                    if console.is_terminal:
+                        console.print(_render_info(settings.llm_provider, settings.llm_model))
+                    else:
+                        console.out(_info_text(settings.llm_provider, settings.llm_model), highlight=False)
                     continue
                 
-                elif user_input.lower() == 'clear':
+                elif cmd == 'clear':
                     console.clear()
                     continue
                 
-                elif user_input.lower() == 'mode':
+                elif cmd == 'mode':
                     console.print("\n[bold yellow]Select new conversation mode:[/bold yellow]")
                     console.print("1. [bold]Expert Mode[/bold] - Direct Q&A with instant answers")
                     console.print("2. [bold]Guided Mode[/bold] - Step-by-step design process")
                     console.print("3. [bold]Standard Mode[/bold] - Comprehensive consulting approach\n")
                     
-                    mode_choice = Prompt.ask("[bold green]Enter mode (1/2/3)[/bold green]", default="1")
+                    mode_choice = await _ask("[bold green]Enter mode (1/2/3)[/bold green]", default="1")
                     
                     if mode_choice == "1":
                         prompt_mode = "expert"
@@ -205,23 +364,34 @@ async def main():
                         console.print("[green]✓ Switched to Standard Consulting Mode[/green]\n")
                     continue
                 
+                # Surface a finished warmup's failure; an unfinished one keeps running
+                if warmup is not None and warmup.done():
+                    if not warmup.cancelled() and warmup.exception():
+                        console.print(f"[dim]Provider warmup failed: {warmup.exception()}[/dim]")
+                    warmup = None
+                
+                if not initialized:
+                    await deps.initialize()
+                    initialized = True
+                
                 # Process the query with selected prompt mode
                 response_text, status = await stream_fm_global_interaction(
-                    user_input, conversation_history, deps, prompt_mode
+                    user_input, recent_context, deps, prompt_mode
                 )
                 
                 if status == "success" and response_text:
                     # Add to conversation history
                     conversation_history.append(f"User: {user_input}")
                     conversation_history.append(f"Assistant: {response_text}")
-                    
-                    # Keep conversation history manageable
-                    if len(conversation_history) > 20:
-                        conversation_history = conversation_history[-20:]
+                    recent_context = "\n".join(
+                        islice(conversation_history, max(0, len(conversation_history) - RECENT_CONTEXT_ENTRIES), None)
+                    )
                 
-            except KeyboardInterrupt:
-                console.print("\n[yellow]Use 'exit' to quit properly.[/yellow]")
-                continue
+            except (EOFError, asyncio.CancelledError):
+                # Ctrl+D ends input; Ctrl+C cancels main() under asyncio.run,
+                # and the stdin thread is still reading, so both exit
+                console.print("\n[yellow]Thank you for using FM Global 8-34 ASRS Expert![/yellow]")
+                break
             except Exception as e:
                 console.print(f"[red]Unexpected error: {e}[/red]")
                 continue
@@ -240,6 +410,10 @@ async def main():
     finally:
         # Cleanup
         try:
+            if 'warmup' in locals() and warmup is not None:
+                # Retrieve the outcome so a failed warmup is not reported as never retrieved
+                warmup.cancel()
+                await asyncio.gather(warmup, return_exceptions=True)
             if 'deps' in locals():
                 await deps.cleanup()
         except:
@@ -247,4 +421,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    # libuv-based event loop where available; the default loop otherwise
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
\ No newline at end of file
@@ -1,6 +1,10 @@
 """Model providers for Semantic Search Agent with retry logic."""
 
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import random
 import time
 import logging
 from pydantic_ai.providers.openai import OpenAIProvider
@@ -10,11 +14,53 @@ from .settings import load_settings
 logger = logging.getLogger(__name__)
 
 
+# Cap on a single retry wait, in seconds, before jitter
+MAX_BACKOFF = 4.0
+
+# Built models keyed by (model name, base URL, API key hash)
+_MODEL_CACHE: Dict[Tuple[str, Optional[str], str], OpenAIModel] = {}
+
+
+def _cache_key(model_name: str, base_url: Optional[str], api_key: str) -> Tuple[str, Optional[str], str]:
+    return model_name, base_url, hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def invalidate_provider_cache():
+    """Drop cached settings, models and derived results so the next call re-reads configuration."""
+    _MODEL_CACHE.clear()
+    load_settings.cache_clear()
+    _cached_model_info.cache_clear()
+    _cached_validate.cache_clear()
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff (1s, 2s, 4s, capped) with jitter against thundering herds."""
+    return min(2 ** attempt, MAX_BACKOFF) + random.uniform(0, 0.5)
+
+
+def _in_event_loop() -> bool:
+    """Whether the current thread is running an asyncio event loop."""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _resolve_llm_config(model_choice: Optional[str]) -> tuple:
+    """Return (model name, base URL, API key) from settings."""
+    settings = load_settings()
+    return model_choice or settings.llm_model, settings.llm_base_url, settings.llm_api_key
+
+
 def get_llm_model(model_choice: Optional[str] = None, max_retries: int = 3) -> OpenAIModel:
     """
     Get LLM model configuration with retry logic.
     Supports any OpenAI-compatible API provider.
     
+    When called from inside a running event loop, retries happen without
+    sleeping so the loop is never blocked; use aget_llm_model() there instead.
+    
     Args:
         model_choice: Optional override for model choice
         max_retries: Maximum number of connection attempts
@@ -22,18 +68,19 @@ def get_llm_model(model_choice: Optional[str] = None, max_retries: int = 3) -> O
     Returns:
         Configured OpenAI-compatible model
     """
-    settings = load_settings()
+    llm_choice, base_url, api_key = _resolve_llm_config(model_choice)
+    key = _cache_key(llm_choice, base_url, api_key)
+    if key in _MODEL_CACHE:
+        return _MODEL_CACHE[key]
     
-    llm_choice = model_choice or settings.llm_model
-    base_url = settings.llm_base_url
-    api_key = settings.llm_api_key
+    can_sleep = not _in_event_loop()
     
     # Retry logic with exponential backoff
     for attempt in range(max_retries):
         try:
             # Create provider based on configuration
             provider = OpenAIProvider(base_url=base_url, api_key=api_key)
-            model = OpenAIModel(llm_choice, provider=provider)
+            model = _MODEL_CACHE[key] = OpenAIModel(llm_choice, provider=provider)
             
             if attempt > 0:
                 logger.info(f"Successfully connected to LLM provider after {attempt + 1} attempts")
@@ -42,10 +89,48 @@ def get_llm_model(model_choice: Optional[str] = None, max_retries: int = 3) -> O
             
         except Exception as e:
             if attempt < max_retries - 1:
-                wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
                 logger.warning(f"Failed to connect to LLM provider (attempt {attempt + 1}/{max_retries}): {e}")
-                logger.info(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
+                if can_sleep:
+                    wait_time = _backoff(attempt)
+                    logger.info(f"Retrying in {wait_time:.1f} seconds...")
+                    time.sleep(wait_time)
+            else:
+                logger.error(f"Failed to connect to LLM provider after {max_retries} attempts: {e}")
+                raise
+
+
+async def aget_llm_model(model_choice: Optional[str] = None, max_retries: int = 3) -> OpenAIModel:
+    """
+    Async variant of get_llm_model that backs off with asyncio.sleep.
+    
+    Args:
+        model_choice: Optional override for model choice
+        max_retries: Maximum number of connection attempts
+    
+    Returns:
+        Configured OpenAI-compatible model
+    """
+    llm_choice, base_url, api_key = _resolve_llm_config(model_choice)
+    key = _cache_key(llm_choice, base_url, api_key)
+    if key in _MODEL_CACHE:
+        return _MODEL_CACHE[key]
+    
+    for attempt in range(max_retries):
+        try:
+            provider = OpenAIProvider(base_url=base_url, api_key=api_key)
+            model = _MODEL_CACHE[key] = OpenAIModel(llm_choice, provider=provider)
+            
+            if attempt > 0:
+                logger.info(f"Successfully connected to LLM provider after {attempt + 1} attempts")
+            
+            return model
+            
+        except Exception as e:
+            if attempt < max_retries - 1:
+                wait_time = _backoff(attempt)
+                logger.warning(f"Failed to connect to LLM provider (attempt {attempt + 1}/{max_retries}): {e}")
+                logger.info(f"Retrying in {wait_time:.1f} seconds...")
+                await asyncio.sleep(wait_time)
             else:
                 logger.error(f"Failed to connect to LLM provider after {max_retries} attempts: {e}")
                 raise
@@ -60,23 +145,20 @@ def get_embedding_model() -> OpenAIModel:
         Configured embedding model
     """
     settings = load_settings()
+    key = _cache_key(settings.embedding_model, settings.llm_base_url, settings.llm_api_key)
+    if key not in _MODEL_CACHE:
+        # For embeddings, use the same provider configuration
+        provider = OpenAIProvider(
+            base_url=settings.llm_base_url, 
+            api_key=settings.llm_api_key
+        )
+        _MODEL_CACHE[key] = OpenAIModel(settings.embedding_model, provider=provider)
     
-    # For embeddings, use the same provider configuration
-    provider = OpenAIProvider(
-        base_url=settings.llm_base_url, 
-        api_key=settings.llm_api_key
-    )
-    
-    return OpenAIModel(settings.embedding_model, provider=provider)
+    return _MODEL_CACHE[key]
 
 
-def get_model_info() -> dict:
-    """
-    Get information about current model configuration.
-    
-    Returns:
-        Dictionary with model configuration info
-    """
+@lru_cache(maxsize=1)
+def _cached_model_info() -> dict:
     settings = load_settings()
     
     return {
@@ -87,14 +169,23 @@ def get_model_info() -> dict:
     }
 
 
-def validate_llm_configuration() -> bool:
+def get_model_info(refresh: bool = False) -> dict:
     """
-    Validate that LLM configuration is properly set.
-    Uses lazy validation to avoid blocking startup.
+    Get information about current model configuration.
+    
+    Args:
+        refresh: Re-read settings instead of using the cached result
     
     Returns:
-        True if configuration is valid
+        Dictionary with model configuration info
     """
+    if refresh:
+        invalidate_provider_cache()
+    return dict(_cached_model_info())
+
+
+@lru_cache(maxsize=1)
+def _cached_validate() -> bool:
     try:
         settings = load_settings()
         # Just check if required settings exist, don't actually connect
@@ -106,4 +197,21 @@ def validate_llm_configuration() -> bool:
         return has_config
     except Exception as e:
         logger.error(f"LLM configuration validation failed: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def validate_llm_configuration(refresh: bool = False) -> bool:
+    """
+    Validate that LLM configuration is properly set.
+    Uses lazy validation to avoid blocking startup; the result is cached
+    until settings are invalidated.
+    
+    Args:
+        refresh: Re-read settings instead of using the cached result
+    
+    Returns:
+        True if configuration is valid
+    """
+    if refresh:
+        invalidate_provider_cache()
+    return _cached_validate()
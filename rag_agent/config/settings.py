@@ -4,6 +4,7 @@ from pydantic_settings import BaseSettings
 from pydantic import Field, ConfigDict
 from dotenv import load_dotenv
 from typing import Optional
+from functools import lru_cache
 
 # Load environment variables from .env file
 load_dotenv()
@@ -85,8 +86,13 @@ class Settings(BaseSettings):
     )
 
 
+@lru_cache(maxsize=1)
 def load_settings() -> Settings:
-    """Load settings with proper error handling."""
+    """Load settings with proper error handling.
+    
+    The result is cached; call load_settings.cache_clear() to re-read the
+    environment.
+    """
     try:
         return Settings()
     except Exception as e:
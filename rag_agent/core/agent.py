@@ -2,9 +2,11 @@
 
 from pydantic_ai import Agent, RunContext
 from typing import Any, Optional
+import asyncio
 import logging
+import threading
 
-from ..config.providers import get_llm_model
+from ..config.providers import get_llm_model, aget_llm_model
 from .dependencies import AgentDependencies
 from .prompts import MAIN_SYSTEM_PROMPT
 from ..tools.tools import semantic_search, hybrid_search
@@ -14,32 +16,69 @@ logger = logging.getLogger(__name__)
 # Global agent instance (lazy-initialized)
 _search_agent: Optional[Agent] = None
 
+# Guard first-use construction: a threading lock for sync callers and the
+# assignment itself, an asyncio lock so concurrent coroutines wait instead
+# of each building a model
+_init_lock = threading.Lock()
+_async_init_lock = asyncio.Lock()
+
+
+def _build_search_agent(model) -> Agent:
+    """Create the search agent and register its tools."""
+    logger.info("Initializing search agent...")
+    # Initialize the semantic search agent
+    agent = Agent(
+        model,
+        deps_type=AgentDependencies,
+        system_prompt=MAIN_SYSTEM_PROMPT
+    )
+    
+    # Register search tools
+    agent.tool(semantic_search)
+    agent.tool(hybrid_search)
+    
+    logger.info("Search agent initialized successfully")
+    return agent
+
 
 def get_search_agent() -> Agent:
-    """Get or create the search agent with lazy initialization."""
+    """Get or create the search agent with lazy, thread-safe initialization."""
+    global _search_agent
+    
+    if _search_agent is None:
+        with _init_lock:
+            if _search_agent is None:
+                try:
+                    _search_agent = _build_search_agent(get_llm_model())
+                except Exception as e:
+                    logger.error(f"Failed to initialize search agent: {e}")
+                    raise
+    
+    return _search_agent
+
+
+async def aget_search_agent() -> Agent:
+    """Async variant of get_search_agent; retries back off without blocking the loop."""
     global _search_agent
     
     if _search_agent is None:
-        try:
-            logger.info("Initializing search agent...")
-            # Initialize the semantic search agent
-            _search_agent = Agent(
-                get_llm_model(),
-                deps_type=AgentDependencies,
-                system_prompt=MAIN_SYSTEM_PROMPT
-            )
-            
-            # Register search tools
-            _search_agent.tool(semantic_search)
-            _search_agent.tool(hybrid_search)
-            
-            logger.info("Search agent initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize search agent: {e}")
-            raise
+        async with _async_init_lock:
+            if _search_agent is None:
+                try:
+                    model = await aget_llm_model()
+                except Exception as e:
+                    logger.error(f"Failed to initialize search agent: {e}")
+                    raise
+                with _init_lock:
+                    if _search_agent is None:
+                        _search_agent = _build_search_agent(model)
     
     return _search_agent
 
 
-# Maintain backward compatibility
-search_agent = property(lambda self: get_search_agent())
+# Maintain backward compatibility: `search_agent` resolves to the lazily built
+# agent on first attribute access (a module-level property never did)
+def __getattr__(name):
+    if name == "search_agent":
+        return get_search_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,158 @@
+"""
+BM25 Keyword Index for FM Global System
+
+Keeps a persistent BM25 index over fm_global_vectors so exact citations like
+"Table 14", "Figure 4" or "K-16.8" are found even when embeddings blur them
+together. Results are merged with vector hits by Reciprocal Rank Fusion.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import bm25s
+except ImportError:  # optional dependency; keyword fusion is skipped without it
+    bm25s = None
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the saved index; fusion is disabled when unset
+BM25_INDEX_PATH = os.getenv("BM25_INDEX_PATH")
+
+# Keyword hits fetched per query, and the RRF rank damping constant
+BM25_CANDIDATES = int(os.getenv("BM25_CANDIDATES", 40))
+RRF_K = int(os.getenv("RRF_K", 60))
+
+# Vector ids in corpus order, saved beside the bm25s files
+_IDS_FILE = "vector_ids.json"
+
+
+def rrf_fuse(*rankings: Sequence[str], k: int = RRF_K) -> List[str]:
+    """
+    Merge ranked id lists with Reciprocal Rank Fusion.
+
+    Args:
+        rankings: Id lists, best first
+        k: Rank damping constant; each hit scores 1 / (k + rank)
+
+    Returns:
+        Ids ordered by fused score (ties keep first-seen order)
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.__getitem__, reverse=True)
+
+
+class FMGlobalBM25Index:
+    """BM25 index over FM Global vector chunks, keyed by vector id."""
+
+    def __init__(self, retriever, vector_ids: List[str]):
+        self.retriever = retriever
+        self.vector_ids = vector_ids
+
+    @classmethod
+    def build(cls, path: str, vector_ids: List[str], texts: List[str]) -> "FMGlobalBM25Index":
+        """Index the chunk texts and save the index to path."""
+        if bm25s is None:
+            raise ImportError("bm25s is required to build the BM25 index")
+
+        retriever = bm25s.BM25()
+        retriever.index(bm25s.tokenize(texts, stopwords="en", show_progress=False), show_progress=False)
+
+        Path(path).mkdir(parents=True, exist_ok=True)
+        retriever.save(path)
+        (Path(path) / _IDS_FILE).write_text(json.dumps(vector_ids), encoding="utf-8")
+
+        return cls(retriever, list(vector_ids))
+
+    @classmethod
+    def load(cls, path: str) -> "FMGlobalBM25Index":
+        """Load a saved index memory-mapped, so worker processes share its pages."""
+        if bm25s is None:
+            raise ImportError("bm25s is required to load the BM25 index")
+
+        retriever = bm25s.BM25.load(path, mmap=True)
+        vector_ids = json.loads((Path(path) / _IDS_FILE).read_text(encoding="utf-8"))
+        return cls(retriever, vector_ids)
+
+    def retrieve(self, query: str, k: int = BM25_CANDIDATES) -> List[str]:
+        """Get the vector ids of the top-k keyword matches, best first."""
+        k = min(k, len(self.vector_ids))
+        if not k:
+            return []
+
+        query_tokens = bm25s.tokenize([query], stopwords="en", show_progress=False)
+        docs, scores = self.retriever.retrieve(query_tokens, k=k, show_progress=False)
+        return [self.vector_ids[doc] for doc, score in zip(docs[0], scores[0]) if score > 0]
+
+
+_index: Optional[FMGlobalBM25Index] = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+def get_bm25_index() -> Optional[FMGlobalBM25Index]:
+    """Get the process-wide BM25 index, or None when it is not configured."""
+    global _index, _index_loaded
+    if not _index_loaded:
+        with _index_lock:
+            if not _index_loaded:
+                if BM25_INDEX_PATH and bm25s is not None:
+                    try:
+                        _index = FMGlobalBM25Index.load(BM25_INDEX_PATH)
+                        logger.info(f"Loaded BM25 index with {len(_index.vector_ids)} chunks")
+                    except Exception as e:
+                        logger.warning(f"Could not load BM25 index from {BM25_INDEX_PATH}: {e}")
+                _index_loaded = True
+    return _index
+
+
+async def build_bm25_index_from_database(db_pool, path: str) -> FMGlobalBM25Index:
+    """
+    Rebuild the BM25 index from every chunk in fm_global_vectors.
+
+    Args:
+        db_pool: asyncpg pool for the FM Global database
+        path: Directory to save the index to
+
+    Returns:
+        The freshly built index
+    """
+    async with db_pool.acquire() as conn:
+        rows = await conn.fetch("SELECT id, content FROM fm_global_vectors ORDER BY id")
+
+    vector_ids = [str(row['id']) for row in rows]
+    texts = [row['content'] for row in rows]
+
+    return await asyncio.to_thread(FMGlobalBM25Index.build, path, vector_ids, texts)
+
+
+async def main():
+    """Build the BM25 index from the configured database."""
+    import argparse
+    import asyncpg
+    from ..config.settings import load_settings
+
+    parser = argparse.ArgumentParser(description="Build the FM Global BM25 index")
+    parser.add_argument("--output", default=BM25_INDEX_PATH, required=BM25_INDEX_PATH is None,
+                        help="Index directory (default: $BM25_INDEX_PATH)")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    db_pool = await asyncpg.create_pool(settings.database_url)
+    try:
+        index = await build_bm25_index_from_database(db_pool, args.output)
+        print(f"Indexed {len(index.vector_ids)} chunks into {args.output}")
+    finally:
+        await db_pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
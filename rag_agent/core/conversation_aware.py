@@ -6,17 +6,80 @@ to improve multi-turn query accuracy and relevance.
 """
 
 import asyncio
+import heapq
 import logging
+import re
+from operator import itemgetter
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import deque
+from collections import OrderedDict, deque
+from itertools import chain, islice
 import json
 
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:
+    # Optional: fall back to per-keyword substring checks
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+# Entity and reference patterns, compiled once at import
+_MEASUREMENT_RE = re.compile(r'\d+\s*(?:ft|m|psi|gpm)', re.IGNORECASE)
+_REFERENCE_RE = re.compile(r'(?:table|figure)\s+[\d\-\.]+', re.IGNORECASE)
+
+# Per-turn decay applied to topic scores, and the score below which a topic is dropped
+TOPIC_DECAY = 0.8
+TOPIC_MIN_SCORE = 0.1
+
+# Dead topics are compacted out of a context every this many turns
+TOPIC_COMPACT_INTERVAL = 32
+
+# Strategy cue words
+_FOLLOW_UP_PRONOUNS = frozenset({'it', 'this', 'that', 'those', 'these'})
+_EXPANSION_STARTERS = ('what about', 'how about', 'and for', 'what if')
+_COMPARISON_WORDS = frozenset({'compare', 'vs', 'versus', 'difference', 'better'})
+
+# Distinct query texts whose extracted entities are kept
+ENTITY_CACHE_SIZE = 2048
+
+# Only the most recent references are ever read back
+MAX_MENTIONED_REFERENCES = 64
+
+# Upper bound on cached conversation contexts; least recently used are evicted
+MAX_CONVERSATION_CONTEXTS = 10000
+
+
+def _result_id(result: Any) -> Any:
+    """A result's id, falling back to its string form only when it has none."""
+    result_id = getattr(result, 'id', None)
+    return str(result) if result_id is None and not hasattr(result, 'id') else result_id
+
+
+def _last_n(items: deque, n: int) -> list:
+    """The last n items of a deque, oldest first, without copying the whole deque."""
+    size = len(items)
+    return list(islice(items, size - n if size > n else 0, size))
+
+
+@dataclass(slots=True)
+class QueryFeatures:
+    """A query lowercased and tokenized once per retrieval."""
+    lower: str
+    tokens: frozenset
+    nwords: int
+    
+    @classmethod
+    def from_query(cls, query: str) -> "QueryFeatures":
+        lower = query.lower()
+        words = lower.split()
+        return cls(lower=lower, tokens=frozenset(w.strip('?!.,;:') for w in words), nwords=len(words))
+
 
-@dataclass
+@dataclass(slots=True)
 class ConversationTurn:
     """Represents a single turn in a conversation."""
     query: str
@@ -25,59 +88,89 @@ class ConversationTurn:
     search_results: List[str] = field(default_factory=list)  # Document IDs retrieved
     metadata: Dict[str, Any] = field(default_factory=dict)
     entities_mentioned: Dict[str, List[str]] = field(default_factory=dict)
+    query_lower: str = field(init=False, repr=False)  # Lowercased once for matching
+    
+    def __post_init__(self):
+        self.query_lower = self.query.lower()
 
 
-@dataclass
+@dataclass(slots=True)
 class ConversationContext:
     """Maintains conversation context for a session."""
     session_id: str
     turns: deque  # ConversationTurn objects
-    active_topics: Dict[str, float]  # Topic -> relevance score
-    mentioned_references: List[str]  # Tables/Figures mentioned
+    active_topics: Dict[Tuple[str, str], Tuple[float, int]]  # (type, value) -> (relevance score, turn index scored at)
+    mentioned_references: deque  # Tables/Figures mentioned, most recent last
     current_focus: Optional[str] = None  # Current area of focus
     created_at: datetime = field(default_factory=datetime.now)
     last_activity: datetime = field(default_factory=datetime.now)
+    turn_index: int = 0  # Turns added so far, drives implicit topic decay
+    mentioned_references_lower: deque = field(default_factory=lambda: deque(maxlen=MAX_MENTIONED_REFERENCES))  # Parallel to mentioned_references
+    _mentioned_refs_set: set = field(default_factory=set, repr=False)  # Lowercased, for O(1) dedupe
     
     def add_turn(self, turn: ConversationTurn):
         """Add a conversation turn and update context."""
         self.turns.append(turn)
+        self.turn_index += 1
         self.last_activity = datetime.now()
         self._update_active_topics(turn)
         self._update_references(turn)
     
+    def _topic_score(self, topic: Tuple[str, str]) -> float:
+        """Current score of a topic, decayed by the turns since it was last scored."""
+        score, scored_at = self.active_topics.get(topic, (0.0, self.turn_index))
+        return score * TOPIC_DECAY ** (self.turn_index - scored_at)
+    
     def _update_active_topics(self, turn: ConversationTurn):
         """Update active topics based on recent turn."""
-        # Decay existing topic scores
-        for topic in self.active_topics:
-            self.active_topics[topic] *= 0.8  # Decay factor
-        
-        # Add new topics from entities
+        # Existing scores decay implicitly; only the mentioned topics are touched
         for entity_type, entities in turn.entities_mentioned.items():
             for entity in entities:
-                topic_key = f"{entity_type}:{entity}"
-                if topic_key in self.active_topics:
-                    self.active_topics[topic_key] = min(1.0, self.active_topics[topic_key] + 0.3)
+                topic_key = (entity_type, entity)
+                score, scored_at = self.active_topics.get(topic_key, (0.0, self.turn_index))
+                age = self.turn_index - scored_at
+                # Survival is judged on last turn's score, before this turn's decay
+                if score * TOPIC_DECAY ** max(age - 1, 0) > TOPIC_MIN_SCORE:
+                    score = min(1.0, score * TOPIC_DECAY ** age + 0.3)
                 else:
-                    self.active_topics[topic_key] = 0.5
+                    score = 0.5
+                self.active_topics[topic_key] = (score, self.turn_index)
         
-        # Remove topics with very low relevance
-        self.active_topics = {k: v for k, v in self.active_topics.items() if v > 0.1}
+        if self.turn_index % TOPIC_COMPACT_INTERVAL == 0:
+            self.topic_scores()
+    
+    def topic_scores(self) -> Dict[Tuple[str, str], float]:
+        """Decayed scores of live topics; topics that fell below the threshold are dropped."""
+        scores = {}
+        for topic in list(self.active_topics):
+            score = self._topic_score(topic)
+            if score > TOPIC_MIN_SCORE:
+                scores[topic] = score
+            else:
+                del self.active_topics[topic]
+        return scores
     
     def _update_references(self, turn: ConversationTurn):
         """Extract and store document references."""
-        import re
-        
-        # Extract table and figure references
-        tables = re.findall(r'table\s+[\d\-\.]+', turn.query + turn.response, re.IGNORECASE)
-        figures = re.findall(r'figure\s+[\d\-\.]+', turn.query + turn.response, re.IGNORECASE)
-        
-        for ref in tables + figures:
-            if ref not in self.mentioned_references:
-                self.mentioned_references.append(ref)
+        # Extract table and figure references, scanning query and response in place
+        for ref in chain(_REFERENCE_RE.findall(turn.query), _REFERENCE_RE.findall(turn.response)):
+            ref_lower = ref.lower()
+            if ref_lower in self._mentioned_refs_set:
+                continue
+            if len(self.mentioned_references_lower) == self.mentioned_references_lower.maxlen:
+                self._mentioned_refs_set.discard(self.mentioned_references_lower[0])
+            self._mentioned_refs_set.add(ref_lower)
+            self.mentioned_references.append(ref)
+            self.mentioned_references_lower.append(ref_lower)
+    
+    def recent_references(self, n: int, lower: bool = False) -> List[str]:
+        """The n most recently mentioned references, oldest first."""
+        refs = self.mentioned_references_lower if lower else self.mentioned_references
+        return _last_n(refs, n)
     
     def get_recent_context(self, n_turns: int = 3) -> str:
         """Get recent conversation context as a string."""
-        recent_turns = list(self.turns)[-n_turns:]
+        recent_turns = _last_n(self.turns, n_turns)
         context_parts = []
         
         for turn in recent_turns:
@@ -94,9 +187,8 @@ class ConversationContext:
         filters = {}
         
         # Add filters based on active topics
-        for topic, score in self.active_topics.items():
+        for (topic_type, topic_value), score in self.topic_scores().items():
             if score > 0.3:  # Only strong topics
-                topic_type, topic_value = topic.split(':', 1)
                 
                 if topic_type == 'asrs_type':
                     filters.setdefault('asrs_types', []).append(topic_value)
@@ -107,7 +199,7 @@ class ConversationContext:
         
         # Add mentioned references as boost factors
         if self.mentioned_references:
-            filters['boost_references'] = self.mentioned_references[-5:]  # Last 5 references
+            filters['boost_references'] = self.recent_references(5)  # Last 5 references
         
         return filters
 
@@ -115,37 +207,46 @@ class ConversationContext:
 class ConversationAwareRetriever:
     """Retriever that considers conversation history for better results."""
     
-    def __init__(self, cache_ttl_minutes: int = 30):
-        self.conversation_cache: Dict[str, ConversationContext] = {}
+    def __init__(self, cache_ttl_minutes: int = 30, max_contexts: int = MAX_CONVERSATION_CONTEXTS):
+        self.conversation_cache: "OrderedDict[str, ConversationContext]" = OrderedDict()
         self.cache_ttl = timedelta(minutes=cache_ttl_minutes)
+        self.max_contexts = max_contexts
         self.entity_extractor = FMGlobalEntityExtractor()
     
     def get_or_create_context(self, session_id: str) -> ConversationContext:
         """Get existing context or create new one."""
-        # Clean expired contexts
-        self._clean_expired_contexts()
-        
-        if session_id not in self.conversation_cache:
-            self.conversation_cache[session_id] = ConversationContext(
-                session_id=session_id,
-                turns=deque(maxlen=10),  # Keep last 10 turns
-                active_topics={},
-                mentioned_references=[]
-            )
-        
-        return self.conversation_cache[session_id]
-    
-    def _clean_expired_contexts(self):
-        """Remove expired conversation contexts."""
         now = datetime.now()
-        expired_sessions = [
-            sid for sid, ctx in self.conversation_cache.items()
-            if now - ctx.last_activity > self.cache_ttl
-        ]
+        context = self.conversation_cache.get(session_id)
         
-        for sid in expired_sessions:
-            del self.conversation_cache[sid]
+        if context is not None:
+            if now - context.last_activity <= self.cache_ttl:
+                self.conversation_cache.move_to_end(session_id)
+                return context
+            del self.conversation_cache[session_id]
+            logger.info(f"Expired conversation context for session {session_id}")
+        
+        # Evict only when inserting a new session
+        self._clean_expired_contexts(now)
+        context = self.conversation_cache[session_id] = ConversationContext(
+            session_id=session_id,
+            turns=deque(maxlen=10),  # Keep last 10 turns
+            active_topics={},
+            mentioned_references=deque(maxlen=MAX_MENTIONED_REFERENCES)
+        )
+        return context
+    
+    def _clean_expired_contexts(self, now: Optional[datetime] = None):
+        """Drop expired contexts from the LRU end and enforce the size cap."""
+        now = now or datetime.now()
+        while self.conversation_cache:
+            sid, ctx = next(iter(self.conversation_cache.items()))
+            if now - ctx.last_activity <= self.cache_ttl:
+                break
+            self.conversation_cache.popitem(last=False)
             logger.info(f"Expired conversation context for session {sid}")
+        
+        while len(self.conversation_cache) >= self.max_contexts:
+            self.conversation_cache.popitem(last=False)
     
     async def retrieve_with_context(
         self,
@@ -172,7 +273,7 @@ class ConversationAwareRetriever:
         entities = self.entity_extractor.extract(query)
         
         # Determine retrieval strategy based on context
-        strategy = self._determine_strategy(query, context)
+        strategy = self._determine_strategy(query, context, QueryFeatures.from_query(query))
         
         # Modify retrieval parameters based on context
         enhanced_kwargs = self._enhance_retrieval_params(
@@ -186,14 +287,21 @@ class ConversationAwareRetriever:
         results = await base_retriever_func(enhanced_query, **enhanced_kwargs)
         
         # Post-process results based on context
-        filtered_results = self._filter_results_by_context(results, context, strategy)
+        result_ids = [_result_id(r) for r in results] if results else []
+        order = self._context_order(results, result_ids, context, strategy)
+        if order is None:
+            filtered_results = results
+            top_ids = result_ids[:5]
+        else:
+            filtered_results = [results[i] for i in order]
+            top_ids = [result_ids[i] for i in order[:5]]
         
         # Record this turn
         turn = ConversationTurn(
             query=query,
             response="",  # Will be filled later
             timestamp=datetime.now(),
-            search_results=[getattr(r, 'id', str(r)) for r in filtered_results[:5]],
+            search_results=top_ids,
             metadata={'strategy': strategy},
             entities_mentioned=entities
         )
@@ -204,36 +312,46 @@ class ConversationAwareRetriever:
             'session_id': session_id,
             'strategy_used': strategy,
             'turns_in_context': len(context.turns),
-            'active_topics': dict(context.active_topics),
-            'mentioned_references': context.mentioned_references[-5:],
+            'active_topics': {
+                f"{topic_type}:{topic_value}": score
+                for (topic_type, topic_value), score in context.topic_scores().items()
+            },
+            'mentioned_references': context.recent_references(5),
             'query_enhanced': enhanced_query != query,
             'filters_applied': enhanced_kwargs.get('filters', {})
         }
         
         return filtered_results, context_metadata
     
-    def _determine_strategy(self, query: str, context: ConversationContext) -> str:
+    def _determine_strategy(
+        self,
+        query: str,
+        context: ConversationContext,
+        features: Optional[QueryFeatures] = None
+    ) -> str:
         """Determine retrieval strategy based on query and context."""
-        query_lower = query.lower()
+        features = features or QueryFeatures.from_query(query)
+        query_lower = features.lower
         
         # Check if this is a follow-up question
-        if context.turns and len(query_lower.split()) < 5:
+        if context.turns and features.nwords < 5:
             # Short query likely refers to previous context
-            if any(word in query_lower for word in ['it', 'this', 'that', 'those', 'these']):
+            if features.tokens & _FOLLOW_UP_PRONOUNS:
                 return 'contextual_refinement'
             
-            if query_lower.startswith(('what about', 'how about', 'and for', 'what if')):
+            if query_lower.startswith(_EXPANSION_STARTERS):
                 return 'contextual_expansion'
         
         # Check if user is drilling down on a topic
-        if context.active_topics and len(context.turns) > 2:
+        active_topics = context.topic_scores()
+        if active_topics and len(context.turns) > 2:
             # Check if current query relates to active topics
-            for topic in context.active_topics:
-                if topic.split(':')[1].lower() in query_lower:
+            for _, topic_value in active_topics:
+                if topic_value.lower() in query_lower:
                     return 'deep_dive'
         
         # Check if user is comparing or contrasting
-        if any(word in query_lower for word in ['compare', 'vs', 'versus', 'difference', 'better']):
+        if any(word in query_lower for word in _COMPARISON_WORDS):
             return 'comparison'
         
         # Default to standard retrieval
@@ -303,10 +421,11 @@ class ConversationAwareRetriever:
         
         elif strategy == 'contextual_expansion':
             # Add active topics as context
-            if context.active_topics:
-                top_topics = sorted(context.active_topics.items(), key=lambda x: x[1], reverse=True)[:3]
+            active_topics = context.topic_scores()
+            if active_topics:
+                top_topics = heapq.nlargest(3, active_topics.items(), key=itemgetter(1))
                 if top_topics:
-                    context_str = "Context: " + ", ".join(t[0].split(':')[1] for t in top_topics)
+                    context_str = "Context: " + ", ".join(topic_value for (_, topic_value), _ in top_topics)
                     enhanced_parts.append(context_str)
         
         elif strategy == 'deep_dive':
@@ -316,7 +435,7 @@ class ConversationAwareRetriever:
             
             # Add recent references
             if context.mentioned_references:
-                refs = context.mentioned_references[-3:]
+                refs = context.recent_references(3)
                 enhanced_parts.append(f"Related to: {', '.join(refs)}")
         
         return " | ".join(enhanced_parts)
@@ -328,44 +447,59 @@ class ConversationAwareRetriever:
         strategy: str
     ) -> List[Any]:
         """Filter and reorder results based on conversation context."""
-        if not results or strategy == 'standard':
+        order = self._context_order(results, [_result_id(r) for r in results or ()], context, strategy)
+        if order is None:
             return results
+        return [results[i] for i in order]
+    
+    def _context_order(
+        self,
+        results: List[Any],
+        result_ids: List[Any],
+        context: ConversationContext,
+        strategy: str
+    ) -> Optional[np.ndarray]:
+        """Result indices ordered by context-adjusted score, or None to keep retrieval order."""
+        if not results or strategy == 'standard':
+            return None
+        
+        # Score every result at once: base similarities times context multipliers
+        refs_lower = context.recent_references(5, lower=True)
+        scores = np.fromiter(
+            (getattr(result, 'similarity', 0.5) for result in results),  # Base score
+            dtype=np.float64,
+            count=len(results)
+        )
         
-        # Score each result based on context relevance
-        scored_results = []
-        
-        for result in results:
-            score = getattr(result, 'similarity', 0.5)  # Base score
-            
-            # Boost if result was previously retrieved and user is drilling down
-            if strategy == 'deep_dive':
-                result_id = getattr(result, 'id', str(result))
-                for turn in list(context.turns)[-3:]:  # Check last 3 turns
-                    if result_id in turn.search_results:
-                        score *= 1.2  # Boost previously seen results
-                        break
-            
-            # Penalize if result was recently shown and strategy is expansion
-            elif strategy == 'contextual_expansion':
-                result_id = getattr(result, 'id', str(result))
-                for turn in list(context.turns)[-2:]:  # Check last 2 turns
-                    if result_id in turn.search_results:
-                        score *= 0.7  # Penalize recently shown results
-                        break
-            
-            # Boost if result contains mentioned references
-            content = getattr(result, 'content', '')
-            for ref in context.mentioned_references[-5:]:
-                if ref.lower() in content.lower():
-                    score *= 1.15
-            
-            scored_results.append((result, score))
-        
-        # Sort by adjusted score
-        scored_results.sort(key=lambda x: x[1], reverse=True)
+        # Boost previously retrieved results when drilling down (last 3 turns),
+        # penalize recently shown ones when expanding (last 2 turns)
+        if strategy in ('deep_dive', 'contextual_expansion'):
+            lookback, factor = (3, 1.2) if strategy == 'deep_dive' else (2, 0.7)
+            recent_ids = set()
+            for turn in _last_n(context.turns, lookback):
+                recent_ids.update(turn.search_results)
+            if recent_ids:
+                seen = np.fromiter(
+                    (result_id in recent_ids for result_id in result_ids),
+                    dtype=bool,
+                    count=len(results)
+                )
+                scores *= np.where(seen, factor, 1.0)
+        
+        # Boost by 1.15 for each mentioned reference the result contains
+        if refs_lower:
+            ref_hits = np.fromiter(
+                (
+                    sum(ref in content_lower for ref in refs_lower)
+                    for content_lower in (getattr(result, 'content', '').lower() for result in results)
+                ),
+                dtype=np.int64,
+                count=len(results)
+            )
+            scores *= np.power(1.15, ref_hits)
         
-        # Return reordered results
-        return [r[0] for r in scored_results]
+        # Reorder by adjusted score; a stable sort keeps ties in retrieval order
+        return np.argsort(-scores, kind='stable')
     
     def update_response(self, session_id: str, response: str):
         """Update the last turn with the generated response."""
@@ -379,32 +513,75 @@ class FMGlobalEntityExtractor:
     
     def __init__(self):
         self.entity_patterns = {
-            'asrs_type': ['shuttle', 'mini-load', 'miniload', 'top-loading'],
-            'container': ['closed-top', 'open-top', 'closed top', 'open top'],
-            'commodity': ['plastic', 'cartoned', 'uncartoned', 'class'],
-            'measurement': r'\d+\s*(?:ft|m|psi|gpm)',
-            'reference': r'(?:table|figure)\s+[\d\-\.]+',
-            'protection': ['wet', 'dry', 'pre-action', 'deluge', 'in-rack', 'iras']
+            'asrs_type': ('shuttle', 'mini-load', 'miniload', 'top-loading'),
+            'container': ('closed-top', 'open-top', 'closed top', 'open top'),
+            'commodity': ('plastic', 'cartoned', 'uncartoned', 'class'),
+            'measurement': _MEASUREMENT_RE,
+            'reference': _REFERENCE_RE,
+            'protection': ('wet', 'dry', 'pre-action', 'deluge', 'in-rack', 'iras')
         }
+        
+        self._automaton = None
+        self._build_matchers()
+        
+        # Immutable results keyed by whitespace-collapsed text, least recently used first
+        self._cache: "OrderedDict[str, Tuple[Tuple[str, Tuple[str, ...]], ...]]" = OrderedDict()
     
     def extract(self, text: str) -> Dict[str, List[str]]:
         """Extract entities from text."""
+        key = " ".join(text.split())
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self._cache[key] = tuple(
+                (entity_type, tuple(found)) for entity_type, found in self._extract(key).items()
+            )
+            if len(self._cache) > ENTITY_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        
+        return {entity_type: list(found) for entity_type, found in cached}
+    
+    def clear_cache(self):
+        """Forget cached extractions and rebuild matchers, e.g. after changing entity_patterns."""
+        self._build_matchers()
+        self._cache.clear()
+    
+    def _build_matchers(self):
+        """Normalize keyword lists to tuples and index them in one automaton."""
+        for entity_type, patterns in self.entity_patterns.items():
+            if not isinstance(patterns, re.Pattern):
+                self.entity_patterns[entity_type] = tuple(patterns)
+        
+        # One automaton over every keyword so a query is scanned in a single pass
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for entity_type, patterns in self.entity_patterns.items():
+                if isinstance(patterns, tuple):
+                    for keyword in patterns:
+                        self._automaton.add_word(keyword, (entity_type, keyword))
+            self._automaton.make_automaton()
+    
+    def _extract(self, text: str) -> Dict[str, List[str]]:
         entities = {}
         text_lower = text.lower()
         
+        hits = None
+        if self._automaton is not None:
+            hits = {payload for _, payload in self._automaton.iter(text_lower)}
+        
         for entity_type, patterns in self.entity_patterns.items():
             found = []
             
-            if isinstance(patterns, list):
-                # Keyword matching
-                for pattern in patterns:
-                    if pattern in text_lower:
-                        found.append(pattern)
-            else:
+            if isinstance(patterns, re.Pattern):
                 # Regex matching
-                import re
-                matches = re.findall(patterns, text, re.IGNORECASE)
-                found.extend(matches)
+                found.extend(patterns.findall(text))
+            else:
+                # Keyword matching, reported in declaration order
+                if hits is not None:
+                    found = [p for p in patterns if (entity_type, p) in hits]
+                else:
+                    found = [p for p in patterns if p in text_lower]
             
             if found:
                 entities[entity_type] = found
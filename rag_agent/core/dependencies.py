@@ -1,11 +1,30 @@
 """Dependencies for Semantic Search Agent."""
 
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import asyncpg
 import openai
 from ..config.settings import load_settings
 
+# One HTTP client per (API key, base URL), shared by every AgentDependencies
+# so requests reuse pooled keep-alive connections instead of new handshakes
+_SHARED_CLIENTS: Dict[Tuple[str, Optional[str]], openai.AsyncOpenAI] = {}
+
+
+def get_shared_openai_client(api_key: str, base_url: Optional[str] = None) -> openai.AsyncOpenAI:
+    """Get the process-wide OpenAI-compatible client for these credentials."""
+    key = (api_key, base_url)
+    if key not in _SHARED_CLIENTS:
+        _SHARED_CLIENTS[key] = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+    return _SHARED_CLIENTS[key]
+
+
+async def close_shared_clients():
+    """Close the shared clients; call once at application shutdown."""
+    while _SHARED_CLIENTS:
+        _, client = _SHARED_CLIENTS.popitem()
+        await client.close()
+
 
 @dataclass
 class AgentDependencies:
@@ -31,7 +50,7 @@ class AgentDependencies:
         
         # Initialize OpenAI client (or compatible provider)
         if not self.openai_client:
-            self.openai_client = openai.AsyncOpenAI(
+            self.openai_client = get_shared_openai_client(
                 api_key=self.settings.llm_api_key,
                 base_url=self.settings.llm_base_url
             )
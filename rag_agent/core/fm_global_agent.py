@@ -1,12 +1,14 @@
 """FM Global 8-34 ASRS Expert Agent Implementation with enhanced RAG capabilities."""
 
 from pydantic_ai import Agent, RunContext
-from typing import Any, Optional
+from typing import Any, Dict, Tuple
 import logging
+import threading
 
 from ..config.providers import get_llm_model
 from .dependencies import AgentDependencies
-from .fm_global_prompts import FM_GLOBAL_SYSTEM_PROMPT, get_active_prompt
+from . import fm_global_prompts
+from .fm_global_prompts import get_active_prompt
 
 # Import both standard and enhanced tools
 from ..tools.fm_global_tools import (
@@ -23,14 +25,56 @@ from ..tools.fm_global_tools_enhanced import (
 
 logger = logging.getLogger(__name__)
 
-# Global agent instance (lazy-initialized)
-_fm_global_agent: Optional[Agent] = None
+# Built agents per (mode, use_enhanced); read without the lock, written under it
+_agents: Dict[Tuple[str, bool], Agent] = {}
+
+# Guards first-use construction so concurrent callers build each agent once
+_init_lock = threading.Lock()
+
+
+def _build(mode: str, use_enhanced: bool) -> Agent:
+    """Create the FM Global agent for one (mode, use_enhanced) pair and register its tools."""
+    logger.info(f"Initializing FM Global expert agent with mode: {mode}, enhanced: {use_enhanced}")
+    
+    # Get the appropriate prompt based on mode
+    system_prompt = get_active_prompt(mode)
+    
+    # Create the agent
+    agent = Agent(
+        get_llm_model(),
+        deps_type=AgentDependencies,
+        system_prompt=system_prompt
+    )
+    
+    # Register enhanced tools if enabled
+    if use_enhanced:
+        # Primary enhanced tool
+        agent.tool(intelligent_fm_global_search)
+        agent.tool(analyze_fm_global_query_intent)
+        
+        # Keep standard tools as fallback
+        agent.tool(get_fm_global_references)
+        agent.tool(asrs_design_search)
+        
+        logger.info("FM Global agent initialized with enhanced RAG capabilities")
+    else:
+        # Register standard FM Global search tools
+        agent.tool(semantic_search_fm_global)
+        agent.tool(hybrid_search_fm_global)
+        agent.tool(get_fm_global_references)
+        agent.tool(asrs_design_search)
+        
+        logger.info("FM Global agent initialized with standard tools")
+    
+    return agent
 
 
 def get_fm_global_agent(mode: str = None, use_enhanced: bool = True) -> Agent:
     """
     Get or create the FM Global expert agent with lazy initialization.
     
+    One agent is cached per (mode, use_enhanced) combination.
+    
     Args:
         mode: Prompt mode - "expert", "guided", or None (uses default)
         use_enhanced: Whether to use enhanced RAG tools (default: True)
@@ -38,47 +82,21 @@ def get_fm_global_agent(mode: str = None, use_enhanced: bool = True) -> Agent:
     Returns:
         The configured FM Global agent
     """
-    global _fm_global_agent
-    
-    if _fm_global_agent is None:
-        try:
-            logger.info(f"Initializing FM Global expert agent with mode: {mode or 'default'}, enhanced: {use_enhanced}")
-            
-            # Get the appropriate prompt based on mode
-            system_prompt = get_active_prompt(mode)
-            
-            # Create the agent
-            _fm_global_agent = Agent(
-                get_llm_model(),
-                deps_type=AgentDependencies,
-                system_prompt=system_prompt
-            )
-            
-            # Register enhanced tools if enabled
-            if use_enhanced:
-                # Primary enhanced tool
-                _fm_global_agent.tool(intelligent_fm_global_search)
-                _fm_global_agent.tool(analyze_fm_global_query_intent)
-                
-                # Keep standard tools as fallback
-                _fm_global_agent.tool(get_fm_global_references)
-                _fm_global_agent.tool(asrs_design_search)
-                
-                logger.info("FM Global agent initialized with enhanced RAG capabilities")
-            else:
-                # Register standard FM Global search tools
-                _fm_global_agent.tool(semantic_search_fm_global)
-                _fm_global_agent.tool(hybrid_search_fm_global)
-                _fm_global_agent.tool(get_fm_global_references)
-                _fm_global_agent.tool(asrs_design_search)
-                
-                logger.info("FM Global agent initialized with standard tools")
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize FM Global agent: {e}")
-            raise
+    # Resolve the default now so a runtime PROMPT_MODE change picks a different agent
+    mode = mode or fm_global_prompts.PROMPT_MODE
     
-    return _fm_global_agent
+    key = (mode, use_enhanced)
+    agent = _agents.get(key)
+    if agent is None:
+        with _init_lock:
+            agent = _agents.get(key)
+            if agent is None:
+                try:
+                    agent = _agents[key] = _build(mode, use_enhanced)
+                except Exception as e:
+                    logger.error(f"Failed to initialize FM Global agent: {e}")
+                    raise
+    return agent
 
 
 # For backward compatibility - direct function reference
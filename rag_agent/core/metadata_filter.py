@@ -5,140 +5,320 @@ This module provides intelligent pre-filtering based on query metadata to reduce
 the vector search space by 60-80%, resulting in faster and more accurate searches.
 """
 
+import itertools
+import os
 import re
+from array import array
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 import logging
 
+try:
+    import ahocorasick
+except ImportError:
+    # Optional: fall back to per-keyword substring checks
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+# Dimension patterns per dimension type, tried in order (first match wins)
+DIMENSION_PATTERNS = {
+    'rack_depth': (
+        (re.compile(r'(\d+)\s*(?:ft|foot|feet)\s+(?:deep|depth|rack)', re.IGNORECASE), 'depth'),
+        (re.compile(r'(?:rack\s+depth|depth)\s+(?:of\s+)?(\d+)\s*(?:ft|foot|feet)', re.IGNORECASE), 'depth'),
+        (re.compile(r'(\d+)ft\s+rack', re.IGNORECASE), 'depth'),
+    ),
+    'spacing': (
+        (re.compile(r'(\d+(?:\.\d+)?)\s*(?:ft|foot|feet)\s+spacing', re.IGNORECASE), 'spacing'),
+        (re.compile(r'spacing\s+(?:of\s+)?(\d+(?:\.\d+)?)\s*(?:ft|foot|feet)', re.IGNORECASE), 'spacing'),
+        (re.compile(r'(\d+(?:\.\d+)?)\s*ft\s+(?:horizontal|between)', re.IGNORECASE), 'spacing'),
+    ),
+    'ceiling_height': (
+        (re.compile(r'(\d+)\s*(?:ft|foot|feet)\s+(?:ceiling|height)', re.IGNORECASE), 'ceiling'),
+        (re.compile(r'ceiling\s+(?:height\s+)?(?:of\s+)?(\d+)\s*(?:ft|foot|feet)', re.IGNORECASE), 'ceiling'),
+    )
+}
+
+# Shared by every dimension pattern: a number followed by ft / foot / feet
+DIMENSION_HINT_RE = re.compile(r'\d\s*(?:ft|foot|feet)', re.IGNORECASE)
+
+# Table / figure / section references in one alternation; the group name says
+# which kind matched ('fig' is the abbreviated figure form)
+REFERENCE_RE = re.compile(
+    r'table\s+(?P<table>[\d\-\.]+)'
+    r'|figure\s+(?P<figure>[\d\-\.]+)'
+    r'|fig\.\s*(?P<fig>[\d\-\.]+)'
+    r'|section\s+(?P<section>[\d\-\.]+)',
+    re.IGNORECASE
+)
+
+
+# Set once commodity_types has been migrated to an indexed text[] column
+# (see sql/metadata_filter_indexes.sql); otherwise commodities use ILIKE
+COMMODITY_TYPES_ARRAY = os.getenv("COMMODITY_TYPES_ARRAY", "false").lower() == "true"
+
+# Indexed range expression for a chunk's ceiling height coverage
+CEILING_HEIGHT_RANGE_SQL = "numrange(ceiling_height_min_ft::numeric, ceiling_height_max_ft::numeric, '[]')"
+
+# Share of the search space each filter type keeps, in estimate_reduction's bit order
+REDUCTION_FACTORS = (
+    0.33,  # asrs_type: 3 main ASRS types
+    0.5,   # container_type: 2 main container types
+    0.25,  # rack_depth_range: 4 main depth categories
+    0.1,   # table/figure numbers: specific reference is very selective
+    0.2,   # commodity_types: multiple commodity classes
+    0.25,  # protection_scheme: 4 main protection schemes
+)
+
+
+def _reduction(mask: int) -> float:
+    reduction = 1.0
+    for bit, factor in enumerate(REDUCTION_FACTORS):
+        if mask >> bit & 1:
+            reduction *= factor
+    return 1.0 - reduction  # Return as percentage reduced
+
+
+# Search space reduction for every combination of present filters
+REDUCTION_TABLE = array('d', map(_reduction, range(1 << len(REDUCTION_FACTORS))))
+
+# hnsw.ef_search bounds for filtered ANN scans (40 is pgvector's default)
+HNSW_EF_SEARCH = 40
+HNSW_MAX_EF_SEARCH = 400
+HNSW_MIN_SELECTIVITY = 0.1
+
+# FilterCriteria fields in the order their conditions are emitted
+_SQL_FIELDS = (
+    'asrs_type', 'container_type', 'rack_depth_range', 'spacing_range', 'table_numbers',
+    'figure_numbers', 'commodity_types', 'protection_scheme', 'ceiling_height_range', 'source_type'
+)
+
+# Columns matched with IN (...)
+_IN_COLUMNS = {
+    'asrs_type': 'asrs_type',
+    'container_type': 'container_type',
+    'table_numbers': 'table_number',
+    'figure_numbers': 'figure_number',
+    'protection_scheme': 'protection_scheme',
+    'source_type': 'source_type'
+}
+
+# Range predicates over a (low, high) parameter pair
+_RANGE_CONDITIONS = {
+    'rack_depth_range': "max_depth_ft BETWEEN {lo} AND {hi}",
+    'spacing_range': "max_spacing_ft BETWEEN {lo} AND {hi}",
+    # Range overlap, backed by the GiST index on the same numrange expression
+    'ceiling_height_range': CEILING_HEIGHT_RANGE_SQL + " && numrange({lo}, {hi}, '[]')"
+}
+
+
+@lru_cache(maxsize=512)
+def _where_clause(shape: Tuple[int, ...]) -> str:
+    """Build the WHERE clause for one filter shape: (param offset, length of each _SQL_FIELDS value)."""
+    param_offset, *counts = shape
+    conditions = []
+    param_counter = 1 + param_offset
+    
+    for name, count in zip(_SQL_FIELDS, counts):
+        if not count:
+            continue
+        
+        if name in _RANGE_CONDITIONS:
+            conditions.append(_RANGE_CONDITIONS[name].format(lo=f"${param_counter}", hi=f"${param_counter + 1}"))
+            param_counter += 2
+        elif name == 'commodity_types' and COMMODITY_TYPES_ARRAY:
+            # One GIN-backed overlap test instead of an ILIKE per commodity
+            conditions.append(f"commodity_types && ${param_counter}::text[]")
+            param_counter += 1
+        elif name == 'commodity_types':
+            commodity_conditions = [f"commodity_types ILIKE ${param_counter + i}" for i in range(count)]
+            conditions.append(f"({' OR '.join(commodity_conditions)})")
+            param_counter += count
+        else:
+            placeholders = ', '.join([f'${param_counter + i}' for i in range(count)])
+            conditions.append(f"{_IN_COLUMNS[name]} IN ({placeholders})")
+            param_counter += count
+    
+    return " AND ".join(conditions) if conditions else "1=1"
+
+
+# Filtered nearest-neighbour search; filter columns are resolved against
+# fm_global_vectors alone inside the subquery
+VECTOR_SEARCH_SQL = """
+    SELECT
+        v.id AS vector_id,
+        v.source_id,
+        v.source_type,
+        v.content,
+        (1 - (v.embedding <=> $1::vector))::float8 AS similarity,
+        v.asrs_topic,
+        v.regulation_section,
+        v.design_parameter,
+        v.metadata,
+        t.table_number,
+        f.figure_number,
+        COALESCE(t.title, f.title, 'N/A') AS reference_title
+    FROM (
+        SELECT * FROM fm_global_vectors
+        WHERE embedding IS NOT NULL AND {where_clause}
+    ) v
+    LEFT JOIN fm_global_tables t ON v.source_id = t.id AND v.source_type = 'table'
+    LEFT JOIN fm_global_figures f ON v.source_id = f.id AND v.source_type = 'figure'
+    ORDER BY v.embedding <=> $1::vector
+    LIMIT $2
+"""
+
+# The same filtered search for a batch of query embeddings in one statement;
+# rows carry the 1-based position of their query as qid
+BATCH_VECTOR_SEARCH_SQL = """
+    SELECT q.qid, hits.*
+    FROM unnest($1::text[]) WITH ORDINALITY AS q(embedding, qid)
+    CROSS JOIN LATERAL (
+        SELECT
+            v.id AS vector_id,
+            v.source_id,
+            v.source_type,
+            v.content,
+            (1 - (v.embedding <=> q.embedding::vector))::float8 AS similarity,
+            v.asrs_topic,
+            v.regulation_section,
+            v.design_parameter,
+            v.metadata,
+            t.table_number,
+            f.figure_number,
+            COALESCE(t.title, f.title, 'N/A') AS reference_title
+        FROM (
+            SELECT * FROM fm_global_vectors
+            WHERE embedding IS NOT NULL AND {where_clause}
+        ) v
+        LEFT JOIN fm_global_tables t ON v.source_id = t.id AND v.source_type = 'table'
+        LEFT JOIN fm_global_figures f ON v.source_id = f.id AND v.source_type = 'figure'
+        ORDER BY v.embedding <=> q.embedding::vector
+        LIMIT $2
+    ) hits
+    ORDER BY q.qid, hits.similarity DESC
+"""
+
+# Whole words that mark a table or figure preference (word -> source type)
+_TOKEN_RE = re.compile(r'[a-z]+')
+_SOURCE_TOKEN_MAP = {
+    'table': 'table',
+    'tables': 'table',
+    'figure': 'figure',
+    'figures': 'figure',
+    'diagram': 'figure',
+    'diagrams': 'figure'
+}
+
+# Log the estimated reduction for one extraction in this many
+FILTER_LOG_SAMPLE_RATE = 64
+_log_counter = itertools.count()
+
+# Distinct queries whose extracted filters are kept by extract_metadata_filters
+FILTER_CACHE_SIZE = 1024
 
-@dataclass
+
+@dataclass(frozen=True)
 class FilterCriteria:
-    """Structured filter criteria for database queries."""
-    asrs_type: Optional[List[str]] = None
-    container_type: Optional[List[str]] = None
+    """Structured filter criteria for database queries (immutable, so cached instances can be shared)."""
+    asrs_type: Optional[Tuple[str, ...]] = None
+    container_type: Optional[Tuple[str, ...]] = None
     rack_depth_range: Optional[Tuple[float, float]] = None
     spacing_range: Optional[Tuple[float, float]] = None
-    table_numbers: Optional[List[str]] = None
-    figure_numbers: Optional[List[str]] = None
-    commodity_types: Optional[List[str]] = None
-    protection_scheme: Optional[List[str]] = None
+    table_numbers: Optional[Tuple[str, ...]] = None
+    figure_numbers: Optional[Tuple[str, ...]] = None
+    commodity_types: Optional[Tuple[str, ...]] = None
+    protection_scheme: Optional[Tuple[str, ...]] = None
     ceiling_height_range: Optional[Tuple[float, float]] = None
-    source_type: Optional[List[str]] = None  # 'table', 'figure', 'text'
+    source_type: Optional[Tuple[str, ...]] = None  # 'table', 'figure', 'text'
     
-    def to_sql_conditions(self) -> Tuple[str, List[Any]]:
-        """Convert filter criteria to SQL WHERE conditions."""
-        conditions = []
-        params = []
-        param_counter = 1
-        
-        if self.asrs_type:
-            placeholders = ', '.join([f'${param_counter + i}' for i in range(len(self.asrs_type))])
-            conditions.append(f"asrs_type IN ({placeholders})")
-            params.extend(self.asrs_type)
-            param_counter += len(self.asrs_type)
-        
-        if self.container_type:
-            placeholders = ', '.join([f'${param_counter + i}' for i in range(len(self.container_type))])
-            conditions.append(f"container_type IN ({placeholders})")
-            params.extend(self.container_type)
-            param_counter += len(self.container_type)
-        
-        if self.rack_depth_range:
-            conditions.append(f"max_depth_ft >= ${param_counter} AND max_depth_ft <= ${param_counter + 1}")
-            params.extend(self.rack_depth_range)
-            param_counter += 2
+    def to_sql_conditions(self, param_offset: int = 0) -> Tuple[str, List[Any]]:
+        """
+        Convert filter criteria to SQL WHERE conditions.
         
-        if self.spacing_range:
-            conditions.append(f"max_spacing_ft >= ${param_counter} AND max_spacing_ft <= ${param_counter + 1}")
-            params.extend(self.spacing_range)
-            param_counter += 2
+        Args:
+            param_offset: Number of positional parameters that precede these
+                in the final statement (the first placeholder is $offset+1)
         
-        if self.table_numbers:
-            placeholders = ', '.join([f'${param_counter + i}' for i in range(len(self.table_numbers))])
-            conditions.append(f"table_number IN ({placeholders})")
-            params.extend(self.table_numbers)
-            param_counter += len(self.table_numbers)
-        
-        if self.figure_numbers:
-            placeholders = ', '.join([f'${param_counter + i}' for i in range(len(self.figure_numbers))])
-            conditions.append(f"figure_number IN ({placeholders})")
-            params.extend(self.figure_numbers)
-            param_counter += len(self.figure_numbers)
-        
-        if self.commodity_types:
-            commodity_conditions = []
-            for commodity in self.commodity_types:
-                commodity_conditions.append(f"commodity_types ILIKE ${param_counter}")
-                params.append(f'%{commodity}%')
-                param_counter += 1
-            conditions.append(f"({' OR '.join(commodity_conditions)})")
+        Returns:
+            Tuple of (where clause, parameters)
+        """
+        # The clause depends only on which fields are set and their lengths
+        shape = (param_offset,) + tuple(len(getattr(self, name) or ()) for name in _SQL_FIELDS)
         
-        if self.protection_scheme:
-            placeholders = ', '.join([f'${param_counter + i}' for i in range(len(self.protection_scheme))])
-            conditions.append(f"protection_scheme IN ({placeholders})")
-            params.extend(self.protection_scheme)
-            param_counter += len(self.protection_scheme)
-        
-        if self.ceiling_height_range:
-            conditions.append(
-                f"ceiling_height_min_ft <= ${param_counter + 1} AND ceiling_height_max_ft >= ${param_counter}"
-            )
-            params.extend(self.ceiling_height_range)
-            param_counter += 2
+        params = []
+        for name in _SQL_FIELDS:
+            value = getattr(self, name)
+            if not value:
+                continue
+            if name != 'commodity_types':
+                params.extend(value)
+            elif COMMODITY_TYPES_ARRAY:
+                params.append(list(value))
+            else:
+                params.extend(f'%{commodity}%' for commodity in value)
+        
+        return _where_clause(shape), params
+    
+    def to_vector_search_sql(self) -> Tuple[str, List[Any]]:
+        """
+        Build one filtered vector search statement.
         
-        if self.source_type:
-            placeholders = ', '.join([f'${param_counter + i}' for i in range(len(self.source_type))])
-            conditions.append(f"source_type IN ({placeholders})")
-            params.extend(self.source_type)
-            param_counter += len(self.source_type)
+        Filtering and nearest-neighbour ordering happen in the same query, so
+        matching rows come back in a single round-trip with the same columns
+        as match_fm_global_vectors. asyncpg caches the prepared statement per
+        distinct SQL text, i.e. once per filter shape.
+        
+        Returns:
+            Tuple of (sql, filter parameters); execute with
+            (embedding, match_count, *filter parameters)
+        """
+        where_clause, params = self.to_sql_conditions(param_offset=2)
+        return VECTOR_SEARCH_SQL.format(where_clause=where_clause), params
+    
+    def to_batch_vector_search_sql(self) -> Tuple[str, List[Any]]:
+        """
+        Build one statement that runs the filtered vector search for many queries.
         
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-        return where_clause, params
+        Returns:
+            Tuple of (sql, filter parameters); execute with
+            (list of embedding strings, match_count per query, *filter parameters)
+        """
+        where_clause, params = self.to_sql_conditions(param_offset=2)
+        return BATCH_VECTOR_SEARCH_SQL.format(where_clause=where_clause), params
     
     def estimate_reduction(self) -> float:
         """Estimate search space reduction percentage."""
-        reduction = 1.0
-        
-        # Each filter type reduces search space
-        if self.asrs_type:
-            reduction *= 0.33  # 3 main ASRS types
-        if self.container_type:
-            reduction *= 0.5   # 2 main container types
-        if self.rack_depth_range:
-            reduction *= 0.25  # 4 main depth categories
-        if self.table_numbers or self.figure_numbers:
-            reduction *= 0.1   # Specific reference is very selective
-        if self.commodity_types:
-            reduction *= 0.2   # Multiple commodity classes
-        if self.protection_scheme:
-            reduction *= 0.25  # 4 main protection schemes
+        # Bit i is set when the i-th REDUCTION_FACTORS filter is present
+        mask = (
+            bool(self.asrs_type)
+            | bool(self.container_type) << 1
+            | bool(self.rack_depth_range) << 2
+            | bool(self.table_numbers or self.figure_numbers) << 3
+            | bool(self.commodity_types) << 4
+            | bool(self.protection_scheme) << 5
+        )
+        return REDUCTION_TABLE[mask]
+    
+    def hnsw_ef_search(self) -> int:
+        """
+        Suggest hnsw.ef_search for an ANN scan restricted by these filters.
         
-        return 1.0 - reduction  # Return as percentage reduced
+        Filters are applied to the candidates the index returns, so the more
+        selective they are the more candidates must be visited to keep a full
+        result set (pgvector's guidance for filtered queries).
+        """
+        remaining = max(1.0 - self.estimate_reduction(), HNSW_MIN_SELECTIVITY)
+        return min(int(HNSW_EF_SEARCH / remaining), HNSW_MAX_EF_SEARCH)
 
 
 class MetadataPreFilter:
     """Extract metadata filters from queries to pre-filter search space."""
     
     def __init__(self):
-        # FM Global specific patterns
-        self.dimension_patterns = {
-            'rack_depth': [
-                (r'(\d+)\s*(?:ft|foot|feet)\s+(?:deep|depth|rack)', 'depth'),
-                (r'(?:rack\s+depth|depth)\s+(?:of\s+)?(\d+)\s*(?:ft|foot|feet)', 'depth'),
-                (r'(\d+)ft\s+rack', 'depth'),
-            ],
-            'spacing': [
-                (r'(\d+(?:\.\d+)?)\s*(?:ft|foot|feet)\s+spacing', 'spacing'),
-                (r'spacing\s+(?:of\s+)?(\d+(?:\.\d+)?)\s*(?:ft|foot|feet)', 'spacing'),
-                (r'(\d+(?:\.\d+)?)\s*ft\s+(?:horizontal|between)', 'spacing'),
-            ],
-            'ceiling_height': [
-                (r'(\d+)\s*(?:ft|foot|feet)\s+(?:ceiling|height)', 'ceiling'),
-                (r'ceiling\s+(?:height\s+)?(?:of\s+)?(\d+)\s*(?:ft|foot|feet)', 'ceiling'),
-            ]
-        }
+        # FM Global specific patterns (compiled once at import)
+        self.dimension_patterns = DIMENSION_PATTERNS
         
         self.asrs_types = {
             'shuttle': ['shuttle', 'shuttle asrs', 'shuttle system'],
@@ -169,13 +349,25 @@ class MetadataPreFilter:
             'in-rack': ['in-rack', 'iras', 'in rack']
         }
         
-        self.reference_patterns = [
-            (r'table\s+([\d\-\.]+)', 'table'),
-            (r'figure\s+([\d\-\.]+)', 'figure'),
-            (r'fig\.\s*([\d\-\.]+)', 'figure'),
-            (r'section\s+([\d\-\.]+)', 'section')
-        ]
-    
+        # Keyword buckets matched together in one pass over the query
+        self._keyword_buckets = {
+            'asrs_type': self.asrs_types,
+            'container_type': self.container_types,
+            'commodity': self.commodity_keywords,
+            'protection': self.protection_schemes
+        }
+        
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for bucket, groups in self._keyword_buckets.items():
+                for label, keywords in groups.items():
+                    for keyword in keywords:
+                        # Shared keywords ('exposed') carry every (bucket, label) they belong to
+                        payload = self._automaton.get(keyword, ())
+                        self._automaton.add_word(keyword, payload + ((bucket, label),))
+            self._automaton.make_automaton()
+        
     def extract_filters(self, query: str) -> FilterCriteria:
         """
         Extract all relevant metadata filters from a query.
@@ -187,83 +379,77 @@ class MetadataPreFilter:
             FilterCriteria object with extracted filters
         """
         query_lower = query.lower()
-        filters = FilterCriteria()
+        tokens = frozenset(_TOKEN_RE.findall(query_lower))
+        criteria = {}
+        
+        # Extract ASRS type, container type, commodities and protection scheme
+        keywords = self._extract_keywords(query_lower)
         
-        # Extract ASRS type
-        asrs_types = self._extract_asrs_type(query_lower)
+        asrs_types = tuple(asrs_type.replace('-', '_') for asrs_type in keywords['asrs_type'])  # Normalize for DB
+        # If no specific type found but "asrs" mentioned, include all
+        if not asrs_types and 'asrs' in query_lower:
+            asrs_types = ('shuttle', 'mini_load', 'all')
         if asrs_types:
-            filters.asrs_type = asrs_types
+            criteria['asrs_type'] = asrs_types
         
-        # Extract container type
-        container_types = self._extract_container_type(query_lower)
-        if container_types:
-            filters.container_type = container_types
+        if keywords['container_type']:
+            criteria['container_type'] = tuple(container_type.replace('-', '_') for container_type in keywords['container_type'])
         
-        # Extract dimensions
-        dimensions = self._extract_dimensions(query)
+        # Extract dimensions; every pattern needs a number followed by a unit,
+        # so one scan for that decides whether the patterns run at all
+        dimensions = self._extract_dimensions(query) if DIMENSION_HINT_RE.search(query) else {}
         if 'rack_depth' in dimensions:
             # Create range around specified depth
             depth = dimensions['rack_depth']
-            filters.rack_depth_range = (depth - 1.0, depth + 3.0)  # Flexible range
+            criteria['rack_depth_range'] = (depth - 1.0, depth + 3.0)  # Flexible range
         
         if 'spacing' in dimensions:
             spacing = dimensions['spacing']
-            filters.spacing_range = (spacing - 0.5, spacing + 2.5)  # Flexible range
+            criteria['spacing_range'] = (spacing - 0.5, spacing + 2.5)  # Flexible range
         
         if 'ceiling_height' in dimensions:
             height = dimensions['ceiling_height']
-            filters.ceiling_height_range = (height - 5.0, height + 10.0)
+            criteria['ceiling_height_range'] = (height - 5.0, height + 10.0)
         
         # Extract references
         references = self._extract_references(query)
-        if 'tables' in references:
-            filters.table_numbers = references['tables']
-        if 'figures' in references:
-            filters.figure_numbers = references['figures']
-        
-        # Extract commodity types
-        commodities = self._extract_commodities(query_lower)
-        if commodities:
-            filters.commodity_types = commodities
-        
-        # Extract protection scheme
-        protection = self._extract_protection_scheme(query_lower)
-        if protection:
-            filters.protection_scheme = protection
+        criteria['table_numbers'] = tuple(references['tables'])
+        criteria['figure_numbers'] = tuple(references['figures'])
         
-        # Determine source type preference
-        if any(ref in query_lower for ref in ['table', 'tables']):
-            filters.source_type = ['table']
-        elif any(ref in query_lower for ref in ['figure', 'figures', 'diagram']):
-            filters.source_type = ['figure']
+        if keywords['commodity']:
+            criteria['commodity_types'] = tuple(keywords['commodity'])
         
-        logger.info(f"Extracted filters - Estimated reduction: {filters.estimate_reduction():.1%}")
+        if keywords['protection']:
+            criteria['protection_scheme'] = tuple(keywords['protection'])
         
-        return filters
-    
-    def _extract_asrs_type(self, query_lower: str) -> Optional[List[str]]:
-        """Extract ASRS type from query."""
-        found_types = []
+        # Determine source type preference; asking for both keeps both
+        source_types = {_SOURCE_TOKEN_MAP[token] for token in tokens if token in _SOURCE_TOKEN_MAP}
+        if source_types:
+            criteria['source_type'] = tuple(sorted(source_types))
         
-        for asrs_type, keywords in self.asrs_types.items():
-            if any(keyword in query_lower for keyword in keywords):
-                found_types.append(asrs_type.replace('-', '_'))  # Normalize for DB
+        filters = FilterCriteria(**criteria)
         
-        # If no specific type found but "asrs" mentioned, include all
-        if not found_types and 'asrs' in query_lower:
-            found_types = ['shuttle', 'mini_load', 'all']
+        if logger.isEnabledFor(logging.INFO) and next(_log_counter) % FILTER_LOG_SAMPLE_RATE == 0:
+            logger.info("Extracted filters - Estimated reduction: %.1f%%", filters.estimate_reduction() * 100)
         
-        return found_types if found_types else None
+        return filters
     
-    def _extract_container_type(self, query_lower: str) -> Optional[List[str]]:
-        """Extract container type from query."""
-        found_types = []
-        
-        for container_type, keywords in self.container_types.items():
-            if any(keyword in query_lower for keyword in keywords):
-                found_types.append(container_type.replace('-', '_'))  # Normalize
-        
-        return found_types if found_types else None
+    def _extract_keywords(self, query_lower: str) -> Dict[str, List[str]]:
+        """Find every keyword bucket's labels in one pass, in declaration order."""
+        if self._automaton is not None:
+            hits = {hit for _, payload in self._automaton.iter(query_lower) for hit in payload}
+        else:
+            hits = {
+                (bucket, label)
+                for bucket, groups in self._keyword_buckets.items()
+                for label, keywords in groups.items()
+                if any(keyword in query_lower for keyword in keywords)
+            }
+        
+        return {
+            bucket: [label for label in groups if (bucket, label) in hits]
+            for bucket, groups in self._keyword_buckets.items()
+        }
     
     def _extract_dimensions(self, query: str) -> Dict[str, float]:
         """Extract dimensional values from query."""
@@ -271,7 +457,7 @@ class MetadataPreFilter:
         
         for dim_type, patterns in self.dimension_patterns.items():
             for pattern, label in patterns:
-                match = re.search(pattern, query, re.IGNORECASE)
+                match = pattern.search(query)
                 if match:
                     try:
                         value = float(match.group(1))
@@ -289,37 +475,15 @@ class MetadataPreFilter:
     
     def _extract_references(self, query: str) -> Dict[str, List[str]]:
         """Extract table and figure references from query."""
-        references = {'tables': [], 'figures': []}
+        found = {'table': [], 'figure': [], 'fig': [], 'section': []}
         
-        for pattern, ref_type in self.reference_patterns:
-            matches = re.findall(pattern, query, re.IGNORECASE)
-            for match in matches:
-                if ref_type == 'table':
-                    references['tables'].append(f"Table {match}")
-                elif ref_type == 'figure':
-                    references['figures'].append(f"Figure {match}")
+        for match in REFERENCE_RE.finditer(query):
+            found[match.lastgroup].append(match.group(match.lastgroup))
         
-        return references
-    
-    def _extract_commodities(self, query_lower: str) -> Optional[List[str]]:
-        """Extract commodity types from query."""
-        found_commodities = []
-        
-        for commodity, keywords in self.commodity_keywords.items():
-            if any(keyword in query_lower for keyword in keywords):
-                found_commodities.append(commodity)
-        
-        return found_commodities if found_commodities else None
-    
-    def _extract_protection_scheme(self, query_lower: str) -> Optional[List[str]]:
-        """Extract protection scheme from query."""
-        found_schemes = []
-        
-        for scheme, keywords in self.protection_schemes.items():
-            if any(keyword in query_lower for keyword in keywords):
-                found_schemes.append(scheme)
-        
-        return found_schemes if found_schemes else None
+        return {
+            'tables': [f"Table {number}" for number in found['table']],
+            'figures': [f"Figure {number}" for number in found['figure'] + found['fig']]
+        }
     
     def create_optimized_query(self, original_query: str, filters: FilterCriteria) -> str:
         """
@@ -356,8 +520,16 @@ metadata_filter = MetadataPreFilter()
 
 # Convenience functions
 def extract_metadata_filters(query: str) -> FilterCriteria:
-    """Extract metadata filters from query."""
-    return metadata_filter.extract_filters(query)
+    """Extract metadata filters from query (cached; see cached_filters.cache_info())."""
+    # Extraction ignores case and runs of whitespace, so queries differing
+    # only in those share one cache entry
+    return cached_filters(" ".join(query.lower().split()))
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def cached_filters(normalized_query: str) -> FilterCriteria:
+    """Filters for an already lowercased, whitespace-collapsed query."""
+    return metadata_filter.extract_filters(normalized_query)
 
 
 def estimate_search_reduction(filters: FilterCriteria) -> float:
@@ -6,12 +6,82 @@ based on query characteristics, domain-specific patterns, and historical perform
 """
 
 import re
-from typing import Dict, Any, List, Optional, Tuple
+import copy
+from functools import lru_cache
+from typing import Dict, Any, List, Literal, Optional, Tuple
 from enum import Enum
 import logging
 
+try:
+    import ahocorasick
+except ImportError:
+    # Optional: fall back to per-term substring checks
+    ahocorasick = None
+
 logger = logging.getLogger(__name__)
 
+# Short social messages that never need retrieval
+_GREETING_RE = re.compile(
+    r"^\s*(hi|hello|hey|thanks?|thank you|good (morning|afternoon|evening)|bye|goodbye)\b[\s!.,]*(there|again|so much|a lot)?[\s!.,]*$",
+    re.IGNORECASE
+)
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9\-\.]*")
+
+# Words that tie a query to FM Global 8-34 / ASRS fire protection
+FM_GLOBAL_VOCABULARY = frozenset({
+    'fm', 'global', '8-34', 'asrs', 'automated', 'storage', 'retrieval',
+    'sprinkler', 'sprinklers', 'k-factor', 'orifice', 'deflector', 'esfr', 'cmsa',
+    'rack', 'racks', 'row', 'single-row', 'double-row', 'multi-row', 'portable',
+    'class', 'commodity', 'commodities', 'plastic', 'plastics', 'cartoned', 'uncartoned',
+    'container', 'containers', 'closed-top', 'open-top', 'tote', 'totes', 'tray', 'trays',
+    'protection', 'fire', 'wet', 'dry', 'pre-action', 'deluge', 'foam-water',
+    'shuttle', 'mini-load', 'miniload', 'crane', 'stacker', 'top-loading',
+    'clearance', 'flue', 'transverse', 'longitudinal', 'vertical', 'horizontal',
+    'spacing', 'ceiling', 'in-rack', 'iras', 'barrier', 'barriers', 'hydraulic', 'pressure',
+    'density', 'demand', 'design', 'layout', 'depth', 'height', 'aisle',
+    'table', 'tables', 'figure', 'figures', 'section', 'appendix', 'requirement', 'requirements',
+    'cost', 'price', 'budget', 'savings', 'optimize', 'comply', 'compliance', 'compliant',
+    'code', 'standard', 'regulation', 'allowed', 'permitted',
+})
+
+
+def fast_route(query: str) -> Literal["greeting", "off_topic", "search"]:
+    """
+    Cheap pre-retrieval triage for queries that should not hit the index.
+
+    Only "greeting" is safe to act on. "off_topic" means the query has no
+    word from FM_GLOBAL_VOCABULARY, which many valid questions lack
+    ("Do I need roof vents?"), so callers should treat it as a hint.
+
+    Args:
+        query: The user's query
+
+    Returns:
+        "greeting" for social messages, "off_topic" when the query has no
+        FM Global vocabulary and no numbers, otherwise "search"
+    """
+    if _GREETING_RE.match(query):
+        return "greeting"
+    
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens or any(token in FM_GLOBAL_VOCABULARY or any(c.isdigit() for c in token) for token in tokens):
+        return "search"
+    return "off_topic"
+
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_WORD_SPAN_RE = re.compile(r"\S+")
+
+
+@lru_cache(maxsize=256)
+def _words(query_lower: str) -> frozenset:
+    """Whole words of a lowercased query; shared by every keyword check on it."""
+    return frozenset(_WORD_RE.findall(query_lower))
+
+
+def _with_plurals(keywords: List[str]) -> frozenset:
+    return frozenset(word for keyword in keywords for word in (keyword, keyword + 's'))
+
 
 class SearchStrategy(Enum):
     """Available search strategies."""
@@ -62,15 +132,36 @@ class FMGlobalQueryRouter:
             r'\d+\s*%'
         ]
         
-        self.cost_keywords = [
+        # All technical terms in one automaton, matched in a single pass
+        self._tech_ac = None
+        if ahocorasick is not None:
+            self._tech_ac = ahocorasick.Automaton()
+            for category, terms in self.technical_terms.items():
+                for term in terms:
+                    payload = self._tech_ac.get(term, ())
+                    self._tech_ac.add_word(term, payload + ((category, term),))
+            self._tech_ac.make_automaton()
+        
+        # Compiled once: one alternation answers "any reference?", the
+        # per-pattern regexes keep extraction order
+        self._reference_regex = re.compile('|'.join(f'(?:{p})' for p in self.reference_patterns), re.IGNORECASE)
+        self._reference_regexes = [re.compile(p, re.IGNORECASE) for p in self.reference_patterns]
+        self._measurement_regexes = [re.compile(p, re.IGNORECASE) for p in self.measurement_patterns]
+        
+        # Keyword sets are matched against whole words (plurals included)
+        self.cost_keywords = _with_plurals([
             'cost', 'price', 'budget', 'economical', 'savings',
             'optimize', 'reduce', 'minimize', 'efficient', 'alternative'
-        ]
+        ])
         
-        self.compliance_keywords = [
+        self.compliance_keywords = _with_plurals([
             'comply', 'compliant', 'meet', 'satisfy', 'requirement',
             'standard', 'code', 'regulation', 'allowed', 'permitted'
-        ]
+        ])
+        
+        self.conceptual_words = _with_plurals([
+            'how', 'why', 'what', 'when', 'explain', 'describe', 'understand'
+        ])
     
     def analyze_query(self, query: str) -> Dict[str, Any]:
         """
@@ -84,16 +175,27 @@ class FMGlobalQueryRouter:
         """
         query_lower = query.lower()
         
+        # Each feature is computed once and shared with the query type decision
+        references = self._extract_references(query)
+        has_specific_reference = bool(references)
+        measurements = self._extract_measurements(query)
+        technical_density = self._calculate_technical_density(query_lower)
+        is_cost_focused = self._is_cost_focused(query_lower)
+        is_compliance_check = self._is_compliance_check(query_lower)
+        
         analysis = {
-            'query_type': self._determine_query_type(query),
-            'has_specific_reference': self._has_specific_reference(query),
-            'has_measurements': bool(self._extract_measurements(query)),
-            'technical_density': self._calculate_technical_density(query_lower),
+            'query_type': self._classify_query(
+                query_lower, has_specific_reference, is_compliance_check,
+                is_cost_focused, measurements, technical_density
+            ),
+            'has_specific_reference': has_specific_reference,
+            'has_measurements': bool(measurements),
+            'technical_density': technical_density,
             'query_length': len(query.split()),
-            'extracted_references': self._extract_references(query),
+            'extracted_references': references,
             'domain_entities': self._extract_domain_entities(query_lower),
-            'is_cost_focused': self._is_cost_focused(query_lower),
-            'is_compliance_check': self._is_compliance_check(query_lower)
+            'is_cost_focused': is_cost_focused,
+            'is_compliance_check': is_compliance_check
         }
         
         return analysis
@@ -212,8 +314,7 @@ class FMGlobalQueryRouter:
             weight += 0.1 * min(len(acronyms), 2)  # Up to 0.2 boost
         
         # Decrease weight for conceptual/descriptive queries
-        conceptual_words = ['how', 'why', 'what', 'when', 'explain', 'describe', 'understand']
-        if any(word in query_lower for word in conceptual_words):
+        if not self.conceptual_words.isdisjoint(_words(query_lower)):
             weight -= 0.1
         
         # Ensure weight stays within bounds
@@ -223,40 +324,54 @@ class FMGlobalQueryRouter:
         """Determine the type of query."""
         query_lower = query.lower()
         
-        if self._has_specific_reference(query):
+        return self._classify_query(
+            query_lower,
+            self._has_specific_reference(query),
+            self._is_compliance_check(query_lower),
+            self._is_cost_focused(query_lower),
+            self._extract_measurements(query),
+            self._calculate_technical_density(query_lower)
+        )
+    
+    def _classify_query(
+        self,
+        query_lower: str,
+        has_specific_reference: bool,
+        is_compliance_check: bool,
+        is_cost_focused: bool,
+        measurements: List[str],
+        technical_density: float
+    ) -> QueryType:
+        """Pick the query type from already computed features."""
+        if has_specific_reference:
             return QueryType.SPECIFIC_REFERENCE
-        elif self._is_compliance_check(query_lower):
+        elif is_compliance_check:
             return QueryType.COMPLIANCE_CHECK
-        elif self._is_cost_focused(query_lower):
+        elif is_cost_focused:
             return QueryType.COST_OPTIMIZATION
         elif any(word in query_lower for word in ['vs', 'versus', 'compare', 'difference']):
             return QueryType.COMPARISON
-        elif self._extract_measurements(query) or self._calculate_technical_density(query_lower) > 0.4:
+        elif measurements or technical_density > 0.4:
             return QueryType.TECHNICAL_SPECIFICATION
         else:
             return QueryType.CONCEPTUAL
     
     def _has_specific_reference(self, query: str) -> bool:
         """Check if query contains specific document references."""
-        for pattern in self.reference_patterns:
-            if re.search(pattern, query, re.IGNORECASE):
-                return True
-        return False
+        return self._reference_regex.search(query) is not None
     
     def _extract_references(self, query: str) -> List[str]:
         """Extract specific references from query."""
         references = []
-        for pattern in self.reference_patterns:
-            matches = re.findall(pattern, query, re.IGNORECASE)
-            references.extend(matches)
+        for pattern in self._reference_regexes:
+            references.extend(pattern.findall(query))
         return references
     
     def _extract_measurements(self, query: str) -> List[str]:
         """Extract measurements from query."""
         measurements = []
-        for pattern in self.measurement_patterns:
-            matches = re.findall(pattern, query, re.IGNORECASE)
-            measurements.extend(matches)
+        for pattern in self._measurement_regexes:
+            measurements.extend(pattern.findall(query))
         return measurements
     
     def _calculate_technical_density(self, query_lower: str) -> float:
@@ -265,6 +380,18 @@ class FMGlobalQueryRouter:
         if not words:
             return 0.0
         
+        if self._tech_ac is not None:
+            # A word is technical when any term occurs inside it; terms have no
+            # spaces, so each match lies within exactly one word
+            match_ends = [end for end, _ in self._tech_ac.iter(query_lower)]
+            if not match_ends:
+                return 0.0
+            technical_count = sum(
+                1 for word in _WORD_SPAN_RE.finditer(query_lower)
+                if any(word.start() <= end < word.end() for end in match_ends)
+            )
+            return technical_count / len(words)
+        
         technical_count = 0
         for word in words:
             for category, terms in self.technical_terms.items():
@@ -278,6 +405,14 @@ class FMGlobalQueryRouter:
         """Extract FM Global domain entities from query."""
         entities = {}
         
+        if self._tech_ac is not None:
+            hits = {hit for _, payload in self._tech_ac.iter(query_lower) for hit in payload}
+            for category, terms in self.technical_terms.items():
+                found_terms = [term for term in terms if (category, term) in hits]
+                if found_terms:
+                    entities[category] = found_terms
+            return entities
+        
         for category, terms in self.technical_terms.items():
             found_terms = [term for term in terms if term in query_lower]
             if found_terms:
@@ -287,21 +422,36 @@ class FMGlobalQueryRouter:
     
     def _is_cost_focused(self, query_lower: str) -> bool:
         """Check if query is focused on cost optimization."""
-        return any(keyword in query_lower for keyword in self.cost_keywords)
+        return not self.cost_keywords.isdisjoint(_words(query_lower))
     
     def _is_compliance_check(self, query_lower: str) -> bool:
         """Check if query is checking compliance."""
-        return any(keyword in query_lower for keyword in self.compliance_keywords)
+        return not self.compliance_keywords.isdisjoint(_words(query_lower))
 
 
 # Singleton instance
 query_router = FMGlobalQueryRouter()
 
+# Distinct queries whose analysis and routing are kept by the convenience functions
+ROUTER_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=ROUTER_CACHE_SIZE)
+def _analyze_cached(query: str) -> Dict[str, Any]:
+    return query_router.analyze_query(query)
+
+
+@lru_cache(maxsize=ROUTER_CACHE_SIZE)
+def _route_cached(query: str) -> Tuple[SearchStrategy, Dict[str, Any]]:
+    return query_router.route_query(query)
+
 
 # Convenience functions
 def route_query(query: str, context: Optional[Dict[str, Any]] = None) -> Tuple[SearchStrategy, Dict[str, Any]]:
-    """Route query to optimal search strategy."""
-    return query_router.route_query(query, context)
+    """Route query to optimal search strategy (cached per query; routing does not use context)."""
+    strategy, params = _route_cached(query)
+    # Callers adjust the parameters, nested ones included, so each gets its own copy
+    return strategy, copy.deepcopy(params)
 
 
 def get_adaptive_text_weight(query: str, base_weight: float = 0.3) -> float:
@@ -310,5 +460,5 @@ def get_adaptive_text_weight(query: str, base_weight: float = 0.3) -> float:
 
 
 def analyze_query(query: str) -> Dict[str, Any]:
-    """Analyze query characteristics."""
-    return query_router.analyze_query(query)
\ No newline at end of file
+    """Analyze query characteristics (cached per query)."""
+    return copy.deepcopy(_analyze_cached(query))
\ No newline at end of file
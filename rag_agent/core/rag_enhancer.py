@@ -6,14 +6,28 @@ specifically tuned for FM Global 8-34 ASRS content.
 """
 
 import re
+import os
 import asyncio
 import logging
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Reranking backend: "heuristic" (domain term scoring), "cross-encoder"
+# (PyTorch) or "onnx" (ONNX Runtime, ideally an int8-quantized export)
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "heuristic")
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+# Directory of an exported (and quantized) ONNX reranker; see export_quantized_reranker()
+RERANKER_ONNX_PATH = os.getenv("RERANKER_ONNX_PATH")
+RERANKER_THREADS = int(os.getenv("RERANKER_THREADS", os.cpu_count() or 1))
+
+# Candidate pool retrieved for the cross-encoder to rescore
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", 30))
+
 
 @dataclass
 class EnhancedSearchResult:
@@ -161,6 +175,9 @@ class FMGlobalQueryExpander:
 class FMGlobalReranker:
     """Reranks search results for FM Global domain."""
     
+    # Minimum number of candidates to retrieve before reranking (None: no oversampling)
+    candidate_count: Optional[int] = None
+    
     def __init__(self):
         self.domain_boost_terms = {
             'table': 2.0,
@@ -299,6 +316,149 @@ class FMGlobalReranker:
         return confidence
 
 
+class CrossEncoderReranker(FMGlobalReranker):
+    """Reranks with a local cross-encoder; confidence still uses the domain heuristics."""
+    
+    candidate_count = RERANK_CANDIDATES
+    
+    def __init__(self, model_name: str = RERANKER_MODEL, batch_size: int = 32):
+        super().__init__()
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = None
+        self._model_lock = threading.Lock()
+    
+    def _get_model(self):
+        """Load the cross-encoder on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    logger.info(f"Loading cross-encoder reranker: {self.model_name}")
+                    self._model = CrossEncoder(self.model_name)
+        return self._model
+    
+    def _score(self, query: str, contents: List[str]) -> np.ndarray:
+        """Score all (query, content) pairs in batches, squashed to [0, 1]."""
+        logits = self._get_model().predict(
+            [(query, content) for content in contents],
+            batch_size=self.batch_size
+        )
+        return 1.0 / (1.0 + np.exp(-np.asarray(logits, dtype=np.float64)))
+    
+    async def rerank_results(
+        self,
+        query: str,
+        results: List[Any],
+        top_k: Optional[int] = None
+    ) -> List[EnhancedSearchResult]:
+        """
+        Rerank search results with the cross-encoder.
+        
+        Args:
+            query: Original search query
+            results: List of search results to rerank
+            top_k: Number of top results to return
+            
+        Returns:
+            List of reranked results with scores
+        """
+        if not results:
+            return []
+        
+        # Model inference is CPU-bound; keep it off the event loop
+        scores = await asyncio.to_thread(
+            self._score, query, [getattr(result, 'content', '') for result in results]
+        )
+        order = np.argsort(-scores, kind='stable')
+        if top_k:
+            order = order[:top_k]
+        
+        return [
+            EnhancedSearchResult(
+                original_result=results[i],
+                rerank_score=float(scores[i]),
+                confidence=self._calculate_confidence(query, results[i], float(scores[i]))
+            )
+            for i in order
+        ]
+
+
+class OnnxCrossEncoderReranker(CrossEncoderReranker):
+    """Cross-encoder reranker served by ONNX Runtime in a single batched forward pass."""
+    
+    def __init__(self, model_path: Optional[str] = RERANKER_ONNX_PATH, model_name: str = RERANKER_MODEL):
+        super().__init__(model_name=model_name)
+        self.model_path = model_path
+        self._tokenizer = None
+    
+    def _get_model(self):
+        """Load the ONNX session and tokenizer on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    import onnxruntime
+                    from optimum.onnxruntime import ORTModelForSequenceClassification
+                    from transformers import AutoTokenizer
+                    
+                    options = onnxruntime.SessionOptions()
+                    options.intra_op_num_threads = RERANKER_THREADS
+                    source = self.model_path or self.model_name
+                    if not self.model_path:
+                        logger.warning("RERANKER_ONNX_PATH not set; exporting an unquantized FP32 model")
+                    logger.info(f"Loading ONNX reranker: {source}")
+                    # export_quantized_reranker() writes model_quantized.onnx
+                    kwargs = {}
+                    if self.model_path and os.path.exists(os.path.join(self.model_path, "model_quantized.onnx")):
+                        kwargs["file_name"] = "model_quantized.onnx"
+                    self._tokenizer = AutoTokenizer.from_pretrained(source)
+                    self._model = ORTModelForSequenceClassification.from_pretrained(
+                        source,
+                        export=not self.model_path,
+                        provider="CPUExecutionProvider",
+                        session_options=options,
+                        **kwargs
+                    )
+        return self._model
+    
+    def _score(self, query: str, contents: List[str]) -> np.ndarray:
+        """Tokenize every pair at once and score them in one session run."""
+        model = self._get_model()
+        inputs = self._tokenizer(
+            [query] * len(contents),
+            contents,
+            padding=True,
+            truncation=True,
+            max_length=512,
+            return_tensors="np"
+        )
+        logits = np.asarray(model(**inputs).logits, dtype=np.float64).reshape(len(contents), -1)[:, -1]
+        return 1.0 / (1.0 + np.exp(-logits))
+
+
+def export_quantized_reranker(output_dir: str, model_name: str = RERANKER_MODEL):
+    """
+    Export a cross-encoder to ONNX and quantize it to int8 (dynamic, AVX-512 VNNI).
+    
+    Run once offline, then point RERANKER_ONNX_PATH at output_dir.
+    
+    Args:
+        output_dir: Directory to write the quantized model and tokenizer to
+        model_name: Hugging Face cross-encoder to export
+    """
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    quantizer = ORTQuantizer.from_pretrained(model)
+    quantizer.quantize(
+        save_dir=output_dir,
+        quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    )
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+
+
 class ContextualEmbeddingEnhancer:
     """Enhances embeddings with contextual information."""
     
@@ -400,6 +560,10 @@ class ResultClustering:
 
 # Singleton instances
 query_expander = FMGlobalQueryExpander()
-reranker = FMGlobalReranker()
+_RERANKERS = {
+    "cross-encoder": CrossEncoderReranker,
+    "onnx": OnnxCrossEncoderReranker,
+}
+reranker = _RERANKERS.get(RERANKER_BACKEND, FMGlobalReranker)()
 embedding_enhancer = ContextualEmbeddingEnhancer()
 result_clusterer = ResultClustering()
\ No newline at end of file
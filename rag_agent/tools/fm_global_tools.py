@@ -1,5 +1,6 @@
 """FM Global 8-34 ASRS Expert Search Tools."""
 
+from functools import cached_property
 from typing import Optional, List, Dict, Any
 from pydantic_ai import RunContext
 from pydantic import BaseModel, Field
@@ -22,6 +23,11 @@ class FMGlobalSearchResult(BaseModel):
     table_number: Optional[str] = None
     figure_number: Optional[str] = None
     reference_title: Optional[str] = None
+    
+    @cached_property
+    def short_content(self) -> str:
+        """Content truncated for context prompts, computed once per result."""
+        return self.content[:200] + "..." if len(self.content) > 200 else self.content
 
 
 class FMGlobalReference(BaseModel):
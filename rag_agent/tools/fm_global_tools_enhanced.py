@@ -6,6 +6,7 @@ metadata pre-filtering, dynamic chunking, and conversation awareness
 into the FM Global search tools.
 """
 
+from functools import cached_property
 from typing import Optional, List, Dict, Any, Tuple
 from pydantic_ai import RunContext
 from pydantic import BaseModel, Field
@@ -14,7 +15,8 @@ import json
 import asyncio
 import logging
 from ..core.dependencies import AgentDependencies
-from ..core.query_router import route_query, get_adaptive_text_weight, SearchStrategy
+from ..core.bm25_index import get_bm25_index, rrf_fuse, BM25_CANDIDATES
+from ..core.query_router import route_query, get_adaptive_text_weight, fast_route, SearchStrategy
 from ..core.rag_enhancer import (
     query_expander,
     reranker,
@@ -49,6 +51,11 @@ class FMGlobalEnhancedResult(BaseModel):
     figure_number: Optional[str] = None
     reference_title: Optional[str] = None
     relevance_explanation: Optional[str] = None
+    
+    @cached_property
+    def short_content(self) -> str:
+        """Content truncated for context prompts, computed once per result."""
+        return self.content[:200] + "..." if len(self.content) > 200 else self.content
 
 
 async def intelligent_fm_global_search(
@@ -88,6 +95,22 @@ async def intelligent_fm_global_search(
     try:
         deps = ctx.deps
         
+        # 0. Greetings skip retrieval; "off_topic" is only a hint, since the
+        # vocabulary check cannot cover every valid FM Global question
+        route = fast_route(query)
+        if route == "off_topic":
+            logger.info(f"No FM Global vocabulary in query, searching anyway: {query[:50]}...")
+        elif route == "greeting":
+            logger.info(f"Skipping retrieval for greeting: {query[:50]}...")
+            return {
+                'query': query,
+                'strategy_used': route,
+                'query_variations': [query],
+                'results': [],
+                'total_results': 0,
+                'search_params': {}
+            }
+        
         # Use default if not specified
         if match_count is None:
             match_count = deps.settings.default_match_count
@@ -96,8 +119,9 @@ async def intelligent_fm_global_search(
         filters = None
         if use_metadata_filter:
             filters = extract_metadata_filters(query)
-            reduction = filters.estimate_reduction()
-            logger.info(f"Metadata pre-filtering enabled - Estimated search space reduction: {reduction:.1%}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Metadata pre-filtering enabled - Estimated search space reduction: %.1f%%",
+                            filters.estimate_reduction() * 100)
         
         # 2. Apply conversation context if session provided (NEW)
         conversation_metadata = {}
@@ -115,6 +139,11 @@ async def intelligent_fm_global_search(
             if 'match_count' not in search_params:
                 search_params['match_count'] = match_count
         
+        # Rerankers that rescore a larger pool get oversampled candidates;
+        # results are cut back to match_count after reranking
+        if use_reranking and reranker.candidate_count:
+            search_params['match_count'] = max(search_params['match_count'], reranker.candidate_count)
+        
         # Add filters to search params
         if filters:
             search_params['filters'] = filters
@@ -156,6 +185,13 @@ async def intelligent_fm_global_search(
                     filters
                 )
                 all_results.extend(results)
+        elif filters and len(query_variations) > 1:  # SEMANTIC, filtered
+            # All variations share the filters, so search them in one round-trip
+            all_results = await _semantic_search_batch(
+                ctx, query_variations,
+                search_params.get('match_count', match_count),
+                filters
+            )
         else:  # SEMANTIC
             # Pure semantic search
             for q_var in query_variations:
@@ -289,14 +325,12 @@ async def _semantic_search_internal(
     async with db_pool.acquire() as conn:
         # Build query with filters if provided
         if filters:
-            where_clause, params = filters.to_sql_conditions()
-            query_sql = f"""
-                SELECT * FROM match_fm_global_vectors($1::vector, $2, NULL, NULL)
-                WHERE vector_id IN (
-                    SELECT id FROM fm_global_vectors WHERE {where_clause}
-                )
-            """
-            rows = await conn.fetch(query_sql, embedding_str, match_count, *params)
+            # Filter and rank in one statement rather than post-filtering a fixed top-k
+            query_sql, params = filters.to_vector_search_sql()
+            # Widen the ANN candidate list to make up for rows the filters drop
+            async with conn.transaction():
+                await conn.execute(f"SET LOCAL hnsw.ef_search = {filters.hnsw_ef_search()}")
+                rows = await conn.fetch(query_sql, embedding_str, match_count, *params)
         else:
             query_sql = """
                 SELECT * FROM match_fm_global_vectors($1::vector, $2, NULL, NULL)
@@ -324,6 +358,50 @@ async def _semantic_search_internal(
         return results
 
 
+async def _semantic_search_batch(
+    ctx: RunContext[AgentDependencies],
+    queries: List[str],
+    match_count: int,
+    filters: FilterCriteria
+) -> List[Any]:
+    """Filtered semantic search for several queries in a single statement."""
+    from .fm_global_tools import FMGlobalSearchResult
+    
+    deps = ctx.deps
+    
+    # Generate embeddings concurrently
+    embeddings = await asyncio.gather(*(deps.get_embedding(q) for q in queries))
+    embedding_strs = ['[' + ','.join(map(str, embedding)) + ']' for embedding in embeddings]
+    
+    query_sql, params = filters.to_batch_vector_search_sql()
+    
+    db_pool = await deps.get_db_pool()
+    async with db_pool.acquire() as conn:
+        # Widen the ANN candidate list to make up for rows the filters drop
+        async with conn.transaction():
+            await conn.execute(f"SET LOCAL hnsw.ef_search = {filters.hnsw_ef_search()}")
+            rows = await conn.fetch(query_sql, embedding_strs, match_count, *params)
+    
+    # Rows are ordered by query, then similarity, like sequential per-query searches
+    return [
+        FMGlobalSearchResult(
+            vector_id=str(row['vector_id']),
+            source_id=str(row['source_id']) if row['source_id'] else None,
+            source_type=row['source_type'],
+            content=row['content'],
+            similarity=float(row['similarity']),
+            asrs_topic=row['asrs_topic'],
+            regulation_section=row['regulation_section'],
+            design_parameter=row['design_parameter'],
+            metadata=row['metadata'] or {},
+            table_number=row['table_number'],
+            figure_number=row['figure_number'],
+            reference_title=row['reference_title']
+        )
+        for row in rows
+    ]
+
+
 async def _hybrid_search_internal(
     ctx: RunContext[AgentDependencies],
     query: str,
@@ -376,7 +454,71 @@ async def _hybrid_search_internal(
             )
             results.append(result)
         
+        # Fuse with BM25 keyword hits when a prebuilt index is configured
+        bm25_index = get_bm25_index()
+        if bm25_index is not None:
+            results = await _fuse_bm25_results(
+                conn, bm25_index, query, results, match_count,
+                filters.asrs_type[0] if filters and filters.asrs_type else None
+            )
+        
+        return results
+
+
+async def _fuse_bm25_results(
+    conn,
+    bm25_index,
+    query: str,
+    results: List[Any],
+    match_count: int,
+    asrs_topic: Optional[str] = None
+) -> List[Any]:
+    """Merge BM25 hits into hybrid results with Reciprocal Rank Fusion."""
+    from .fm_global_tools import FMGlobalSearchResult
+    
+    bm25_ids = await asyncio.to_thread(bm25_index.retrieve, query, BM25_CANDIDATES)
+    if not bm25_ids:
         return results
+    
+    by_id = {result.vector_id: result for result in results}
+    fused_ids = rrf_fuse([result.vector_id for result in results], bm25_ids)[:match_count]
+    
+    # Keyword-only hits are loaded from the table and scored no higher than the weakest vector hit
+    missing = [vector_id for vector_id in fused_ids if vector_id not in by_id]
+    if missing:
+        floor = min((result.similarity for result in results), default=0.0)
+        rows = await conn.fetch(
+            """
+            SELECT v.id, v.source_id, v.source_type, v.content, v.asrs_topic,
+                   v.regulation_section, v.design_parameter, v.metadata,
+                   t.table_number, f.figure_number,
+                   COALESCE(t.title, f.title, 'N/A') AS reference_title
+            FROM fm_global_vectors v
+            LEFT JOIN fm_global_tables t ON v.source_id = t.id AND v.source_type = 'table'
+            LEFT JOIN fm_global_figures f ON v.source_id = f.id AND v.source_type = 'figure'
+            WHERE v.id = ANY($1::uuid[])
+                AND ($2::text IS NULL OR v.asrs_topic = $2)
+            """,
+            missing,
+            asrs_topic
+        )
+        for row in rows:
+            by_id[str(row['id'])] = FMGlobalSearchResult(
+                vector_id=str(row['id']),
+                source_id=str(row['source_id']) if row['source_id'] else None,
+                source_type=row['source_type'],
+                content=row['content'],
+                similarity=floor,
+                asrs_topic=row['asrs_topic'],
+                regulation_section=row['regulation_section'],
+                design_parameter=row['design_parameter'],
+                metadata=row['metadata'] or {},
+                table_number=row['table_number'],
+                figure_number=row['figure_number'],
+                reference_title=row['reference_title']
+            )
+    
+    return [by_id[vector_id] for vector_id in fused_ids if vector_id in by_id]
 
 
 async def _multi_stage_search(
@@ -464,10 +606,10 @@ async def analyze_fm_global_query_intent(
     Returns:
         Dictionary with query analysis including intent, entities, and recommendations
     """
-    from ..core.query_router import query_router
+    from ..core.query_router import analyze_query
     
     # Get query analysis
-    analysis = query_router.analyze_query(query)
+    analysis = analyze_query(query)
     
     # Get recommended search strategy
     strategy, params = route_query(query)
@@ -22,6 +22,7 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     packages=find_packages(),
+    package_data={"rag_agent.core": ["*.md"]},
     install_requires=requirements,
     python_requires=">=3.10",
     entry_points={
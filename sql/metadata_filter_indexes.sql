@@ -0,0 +1,51 @@
+-- Indexes backing the metadata pre-filter (rag_agent/core/metadata_filter.py)
+-- FilterCriteria.to_sql_conditions() filters fm_global_vectors by these columns.
+-- Run with plain psql (not inside a transaction): CONCURRENTLY avoids locking writes.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Equality / IN (...) predicates
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_asrs_type ON fm_global_vectors (asrs_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_container_type ON fm_global_vectors (container_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_source_type ON fm_global_vectors (source_type);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_protection_scheme ON fm_global_vectors (protection_scheme);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_table_number ON fm_global_vectors (table_number);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_figure_number ON fm_global_vectors (figure_number);
+
+-- Range predicates (max_depth_ft / max_spacing_ft BETWEEN $lo AND $hi)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_max_depth_ft ON fm_global_vectors (max_depth_ft);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_max_spacing_ft ON fm_global_vectors (max_spacing_ft);
+
+-- Ceiling height overlap (numrange(...) && numrange($lo, $hi, '[]')); the expression
+-- must match CEILING_HEIGHT_RANGE_SQL in metadata_filter.py for the index to be used
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_ceiling_height_range
+    ON fm_global_vectors USING gist (numrange(ceiling_height_min_ft::numeric, ceiling_height_max_ft::numeric, '[]'));
+
+-- commodity_types ILIKE '%...%' (text column)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_commodity_types_trgm
+    ON fm_global_vectors USING gin (commodity_types gin_trgm_ops);
+
+-- Optional: store commodity_types as text[] for a single overlap (&&) probe.
+-- After running this block, set COMMODITY_TYPES_ARRAY=true for the application.
+--
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_fm_global_vectors_commodity_types_trgm;
+-- ALTER TABLE fm_global_vectors
+--     ALTER COLUMN commodity_types TYPE text[]
+--     USING regexp_split_to_array(lower(commodity_types), '\s*,\s*');
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_commodity_types_gin
+--     ON fm_global_vectors USING gin (commodity_types);
+
+-- Partial HNSW indexes per common pre-filter bucket, so a query narrowed to one
+-- bucket can use an ANN index over just that subset instead of scanning it
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_embedding_shuttle
+    ON fm_global_vectors USING hnsw (embedding vector_cosine_ops) WHERE asrs_type = 'shuttle';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_embedding_mini_load
+    ON fm_global_vectors USING hnsw (embedding vector_cosine_ops) WHERE asrs_type = 'mini_load';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_embedding_top_loading
+    ON fm_global_vectors USING hnsw (embedding vector_cosine_ops) WHERE asrs_type = 'top_loading';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_embedding_table
+    ON fm_global_vectors USING hnsw (embedding vector_cosine_ops) WHERE source_type = 'table';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_embedding_figure
+    ON fm_global_vectors USING hnsw (embedding vector_cosine_ops) WHERE source_type = 'figure';
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_fm_global_vectors_embedding_text
+    ON fm_global_vectors USING hnsw (embedding vector_cosine_ops) WHERE source_type = 'text';
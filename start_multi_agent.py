@@ -98,7 +98,8 @@ def start_multi_agent_server():
                 workers=workers,
                 log_level="info",
                 access_log=True,
-                loop="uvloop"
+                loop="uvloop",
+                http="httptools"
             )
         else:
             # Single worker for development/free tier
@@ -112,7 +113,8 @@ def start_multi_agent_server():
                 access_log=True,
                 timeout_keep_alive=75,
                 timeout_notify=60,
-                loop="uvloop"
+                loop="uvloop",
+                http="httptools"
             )
         
     except ImportError as e:
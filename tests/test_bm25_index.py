@@ -0,0 +1,29 @@
+"""Test keyword / vector result fusion."""
+
+from rag_agent.core.bm25_index import rrf_fuse
+
+
+class TestRRFFuse:
+    """Test Reciprocal Rank Fusion of ranked id lists."""
+
+    def test_single_ranking_is_unchanged(self):
+        """Test one ranking keeps its order."""
+        assert rrf_fuse(["a", "b", "c"]) == ["a", "b", "c"]
+
+    def test_ids_in_both_rankings_rise(self):
+        """Test an id found by both retrievers outranks single hits."""
+        assert rrf_fuse(["a", "b", "c"], ["c", "d"])[0] == "c"
+
+    def test_scores_use_rank_damping(self):
+        """Test fused order follows 1 / (k + rank) sums."""
+        # k=1: a = 1/2 + 1/5, b = 1/3 + 1/3, c = 1/2
+        assert rrf_fuse(["a", "b"], ["c", "b", "d", "a"], k=1)[:2] == ["a", "b"]
+
+    def test_ties_keep_first_seen_order(self):
+        """Test equal scores keep the order ids were first seen."""
+        assert rrf_fuse(["a", "b"], ["b", "a"]) == ["a", "b"]
+
+    def test_empty_rankings(self):
+        """Test no input gives no output."""
+        assert rrf_fuse() == []
+        assert rrf_fuse([], []) == []
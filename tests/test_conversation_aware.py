@@ -0,0 +1,132 @@
+"""Test conversation context tracking."""
+
+import random
+import pytest
+from collections import deque
+from datetime import datetime
+
+from rag_agent.core.conversation_aware import (
+    ConversationContext,
+    ConversationTurn,
+    FMGlobalEntityExtractor,
+    TOPIC_DECAY,
+    TOPIC_MIN_SCORE,
+)
+
+
+def _new_context():
+    """Create an empty conversation context."""
+    return ConversationContext(session_id="test", turns=deque(maxlen=10), active_topics={},
+                               mentioned_references=deque())
+
+
+def _turn(*commodities):
+    """Create a turn mentioning the given commodity classes."""
+    return ConversationTurn(query="q", response="r", timestamp=datetime.now(),
+                            entities_mentioned={'commodity_class': list(commodities)} if commodities else {})
+
+
+def _eager_scores(turns):
+    """Reference topic scores using per-turn decay and pruning."""
+    topics = {}
+    for mentioned in turns:
+        for topic in topics:
+            topics[topic] *= TOPIC_DECAY
+        for entity in mentioned:
+            key = ('commodity_class', entity)
+            topics[key] = min(1.0, topics[key] + 0.3) if key in topics else 0.5
+        topics = {k: v for k, v in topics.items() if v > TOPIC_MIN_SCORE}
+    return topics
+
+
+class TestTopicDecay:
+    """Test lazily decayed topic scores match per-turn decay."""
+
+    def test_new_topic_starts_at_half(self):
+        """Test a first mention scores 0.5."""
+        context = _new_context()
+        context.add_turn(_turn("Class 2"))
+
+        assert context.topic_scores() == {('commodity_class', 'Class 2'): 0.5}
+
+    def test_repeat_mention_adds_to_decayed_score(self):
+        """Test a live topic gets +0.3 on its decayed score."""
+        context = _new_context()
+        context.add_turn(_turn("Class 2"))
+        context.add_turn(_turn())
+        context.add_turn(_turn("Class 2"))
+
+        assert context.topic_scores()[('commodity_class', 'Class 2')] == pytest.approx(0.5 * 0.8 ** 2 + 0.3)
+
+    def test_topic_alive_last_turn_is_not_reset(self):
+        """Test survival is checked on the previous turn's score."""
+        context = _new_context()
+        context.add_turn(_turn("Class 2"))
+        for _ in range(7):
+            context.add_turn(_turn())
+        # 0.5 * 0.8 ** 7 ~= 0.105 survived last turn, so decay and add
+        context.add_turn(_turn("Class 2"))
+
+        assert context.topic_scores()[('commodity_class', 'Class 2')] == pytest.approx(0.5 * 0.8 ** 8 + 0.3)
+
+    def test_pruned_topic_restarts(self):
+        """Test a topic that fell below the threshold restarts at 0.5."""
+        context = _new_context()
+        context.add_turn(_turn("Class 2"))
+        for _ in range(8):
+            context.add_turn(_turn())
+        context.add_turn(_turn("Class 2"))
+
+        assert context.topic_scores()[('commodity_class', 'Class 2')] == 0.5
+
+    def test_same_topic_twice_in_one_turn(self):
+        """Test a repeated mention within a turn adds 0.3 again."""
+        context = _new_context()
+        context.add_turn(_turn("Class 2", "Class 2"))
+
+        assert context.topic_scores()[('commodity_class', 'Class 2')] == pytest.approx(0.8)
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_eager_decay(self, seed):
+        """Test random turn sequences score the same as per-turn decay."""
+        rng = random.Random(seed)
+        turns = [rng.sample(["Class 1", "Class 2", "Class 3", "Group A"], rng.randint(0, 2))
+                 for _ in range(100)]
+
+        context = _new_context()
+        for i, mentioned in enumerate(turns, start=1):
+            context.add_turn(_turn(*mentioned))
+            expected = _eager_scores(turns[:i])
+            assert context.topic_scores() == pytest.approx(expected)
+
+
+class TestEntityExtractor:
+    """Test FM Global entity extraction."""
+
+    def test_extracts_keywords_and_patterns(self):
+        """Test keyword and regex entities are both found."""
+        extractor = FMGlobalEntityExtractor()
+        entities = extractor.extract("Shuttle ASRS with open-top containers at 30 ft, see Table 14")
+
+        assert entities['asrs_type'] == ['shuttle']
+        assert entities['container'] == ['open-top']
+        assert entities['measurement'] == ['30 ft']
+        assert entities['reference'] == ['Table 14']
+
+    def test_list_patterns_are_accepted(self):
+        """Test caller-supplied keyword lists work like tuples."""
+        extractor = FMGlobalEntityExtractor()
+        extractor.entity_patterns['hazard'] = ['lithium-ion', 'aerosol']
+        extractor.clear_cache()
+
+        assert extractor.extract("Storing lithium-ion batteries")['hazard'] == ['lithium-ion']
+
+    def test_clear_cache_picks_up_new_patterns(self):
+        """Test edited patterns are matched after clear_cache."""
+        extractor = FMGlobalEntityExtractor()
+        assert 'container' not in extractor.extract("tote storage")
+
+        extractor.entity_patterns['container'] += ('tote',)
+        extractor.clear_cache()
+
+        assert extractor.extract("tote storage")['container'] == ['tote']
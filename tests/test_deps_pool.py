@@ -0,0 +1,59 @@
+"""Test the warm dependencies pool."""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from rag_agent.api import deps_pool
+
+
+def _fake_deps(session_id=None, db_pool=None):
+    """Create a stand-in dependencies object holding db_pool."""
+    return SimpleNamespace(session_id=session_id, db_pool=db_pool, cleanup=AsyncMock())
+
+
+class TestCreateDepsPool:
+    """Test pool creation, sharing and teardown."""
+
+    @pytest.mark.asyncio
+    async def test_deps_share_one_db_pool(self):
+        """Test every pooled deps gets the shared database pool."""
+        db_pool = AsyncMock()
+        with patch.object(deps_pool, "_new_deps", AsyncMock(side_effect=_fake_deps)):
+            pool = await deps_pool.create_deps_pool(db_pool, 3)
+
+        assert pool.qsize() == 3
+        assert all(deps.db_pool is db_pool for deps in pool._queue)
+
+    @pytest.mark.asyncio
+    async def test_close_closes_shared_db_pool_once(self):
+        """Test teardown closes the shared pool once, not through each deps."""
+        db_pool = AsyncMock()
+        with patch.object(deps_pool, "_new_deps", AsyncMock(side_effect=_fake_deps)):
+            pool = await deps_pool.create_deps_pool(db_pool, 3)
+        created = list(pool._queue)
+
+        await deps_pool.close_deps_pool(pool, db_pool)
+
+        db_pool.close.assert_awaited_once()
+        for deps in created:
+            deps.cleanup.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failure_falls_back_without_closing_shared_pool(self):
+        """Test a failed fill disables the pool and leaves the shared pool to its owner."""
+        db_pool = AsyncMock()
+        new_deps = AsyncMock(side_effect=[_fake_deps(db_pool=db_pool), RuntimeError("settings unavailable")])
+        with patch.object(deps_pool, "_new_deps", new_deps):
+            pool = await deps_pool.create_deps_pool(db_pool, 4)
+
+        assert pool is None
+        db_pool.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_no_shared_db_pool_disables_pool(self):
+        """Test handlers fall back to per-request init without a shared pool."""
+        with patch.object(deps_pool, "_new_deps", AsyncMock()) as new_deps:
+            assert await deps_pool.create_deps_pool(None, 4) is None
+
+        new_deps.assert_not_awaited()
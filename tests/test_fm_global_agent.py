@@ -0,0 +1,49 @@
+"""Test FM Global agent construction and caching."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from rag_agent.core import fm_global_agent
+
+
+class TestGetFMGlobalAgent:
+    """Test agents are built once per (mode, use_enhanced)."""
+
+    def test_concurrent_callers_build_once(self):
+        """Test racing first callers share one built agent."""
+        def slow_build(mode, use_enhanced):
+            time.sleep(0.05)
+            return object()
+
+        with patch.dict(fm_global_agent._agents, clear=True), \
+                patch.object(fm_global_agent, "_build", side_effect=slow_build) as build:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                agents = list(pool.map(lambda _: fm_global_agent.get_fm_global_agent("expert"), range(8)))
+
+        assert build.call_count == 1
+        assert all(agent is agents[0] for agent in agents)
+
+    def test_one_agent_per_mode_and_tools(self):
+        """Test each (mode, use_enhanced) pair gets its own agent."""
+        with patch.dict(fm_global_agent._agents, clear=True), \
+                patch.object(fm_global_agent, "_build", side_effect=lambda *key: object()) as build:
+            expert = fm_global_agent.get_fm_global_agent("expert")
+            guided = fm_global_agent.get_fm_global_agent("guided")
+            standard_tools = fm_global_agent.get_fm_global_agent("expert", use_enhanced=False)
+
+            assert fm_global_agent.get_fm_global_agent("expert") is expert
+            assert len({id(expert), id(guided), id(standard_tools)}) == 3
+            assert build.call_count == 3
+
+    def test_cached_lookup_does_not_wait_for_lock(self):
+        """Test a built agent is returned while another build holds the lock."""
+        with patch.dict(fm_global_agent._agents, {("expert", True): "cached"}, clear=True):
+            with fm_global_agent._init_lock:
+                result = []
+                reader = threading.Thread(target=lambda: result.append(fm_global_agent.get_fm_global_agent("expert")))
+                reader.start()
+                reader.join(timeout=1)
+
+        assert result == ["cached"]
@@ -0,0 +1,39 @@
+"""Test the general RAG direct search endpoint."""
+
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+from rag_agent.api.routers import general_rag_router
+from rag_agent.api.routers.general_rag_router import GeneralQuery, direct_search
+from rag_agent.tools import tools
+
+
+@asynccontextmanager
+async def _fake_deps(request, session_id):
+    yield None
+
+
+class TestDirectSearchCache:
+    """Test cached direct-search results expire."""
+
+    @pytest.mark.asyncio
+    async def test_results_are_cached_until_ttl(self):
+        """Test repeats within the TTL are served from cache and refetched after it."""
+        search = AsyncMock(side_effect=[["first"], ["second"]])
+        query = GeneralQuery(query="sprinkler spacing", search_strategy="hybrid")
+
+        with patch.dict(general_rag_router._search_cache, clear=True), \
+                patch.object(general_rag_router, "pooled_deps", _fake_deps), \
+                patch.object(tools, "hybrid_search", search), \
+                patch.object(general_rag_router.time, "monotonic") as clock:
+            clock.return_value = 100.0
+            assert (await direct_search(query, None))["results"] == ["first"]
+
+            clock.return_value = 100.0 + general_rag_router.SEARCH_CACHE_TTL - 1
+            assert (await direct_search(query, None))["results"] == ["first"]
+
+            clock.return_value = 100.0 + general_rag_router.SEARCH_CACHE_TTL
+            assert (await direct_search(query, None))["results"] == ["second"]
+
+        assert search.await_count == 2
@@ -0,0 +1,126 @@
+"""Test metadata pre-filter extraction and SQL generation."""
+
+import re
+import pytest
+
+from rag_agent.core.metadata_filter import (
+    CEILING_HEIGHT_RANGE_SQL,
+    COMMODITY_TYPES_ARRAY,
+    HNSW_EF_SEARCH,
+    HNSW_MAX_EF_SEARCH,
+    FilterCriteria,
+    _where_clause,
+    extract_metadata_filters,
+)
+
+
+def _placeholders(sql):
+    """Positional parameter numbers used in sql, in order of appearance."""
+    return [int(n) for n in re.findall(r"\$(\d+)", sql)]
+
+
+class TestExtractMetadataFilters:
+    """Test filter extraction from queries."""
+
+    def test_extracts_types_references_and_ranges(self):
+        """Test a detailed query yields each filter."""
+        filters = extract_metadata_filters("Shuttle ASRS with open-top containers, 30 ft ceiling height, see Table 14")
+
+        assert filters.asrs_type == ('shuttle',)
+        assert filters.container_type == ('open_top',)
+        assert filters.table_numbers == ('Table 14',)
+        assert filters.ceiling_height_range == (25.0, 40.0)
+        assert filters.source_type == ('table',)
+
+    def test_cached_per_query(self):
+        """Test repeated queries share one immutable result."""
+        assert extract_metadata_filters("Table 14 shuttle") is extract_metadata_filters("Table 14 shuttle")
+
+    def test_ef_search_grows_with_selectivity(self):
+        """Test stricter filters widen the HNSW candidate list."""
+        assert FilterCriteria().hnsw_ef_search() == HNSW_EF_SEARCH
+        selective = extract_metadata_filters("Shuttle ASRS with open-top containers, see Table 14")
+        assert HNSW_EF_SEARCH < selective.hnsw_ef_search() <= HNSW_MAX_EF_SEARCH
+
+    def test_cached_per_normalized_query(self):
+        """Test case and whitespace variants share one result."""
+        assert extract_metadata_filters("Table 14  shuttle") is extract_metadata_filters("table 14 Shuttle")
+
+    def test_tables_and_figures_keep_both_source_types(self):
+        """Test a query naming both keeps both source types."""
+        filters = extract_metadata_filters("Compare tables and figures for shuttle systems")
+
+        assert set(filters.source_type) == {'table', 'figure'}
+
+
+class TestFilterCriteriaSQL:
+    """Test WHERE clauses and search statements built from FilterCriteria."""
+
+    def test_empty_criteria_match_everything(self):
+        """Test no filters give a neutral clause."""
+        assert FilterCriteria().to_sql_conditions() == ("1=1", [])
+
+    def test_conditions_follow_field_order(self):
+        """Test IN and range conditions with their parameters."""
+        criteria = FilterCriteria(
+            asrs_type=('shuttle', 'mini_load'),
+            rack_depth_range=(3.0, 6.0),
+            table_numbers=('Table 14',),
+            ceiling_height_range=(25.0, 40.0),
+            source_type=('table',),
+        )
+        where, params = criteria.to_sql_conditions()
+
+        assert where == (
+            "asrs_type IN ($1, $2) AND max_depth_ft BETWEEN $3 AND $4 AND table_number IN ($5) AND "
+            f"{CEILING_HEIGHT_RANGE_SQL} && numrange($6, $7, '[]') AND source_type IN ($8)"
+        )
+        assert params == ['shuttle', 'mini_load', 3.0, 6.0, 'Table 14', 25.0, 40.0, 'table']
+
+    @pytest.mark.skipif(COMMODITY_TYPES_ARRAY, reason="text[] commodity column enabled")
+    def test_commodity_types_use_ilike(self):
+        """Test each commodity is a substring match."""
+        where, params = FilterCriteria(commodity_types=('class 2', 'cartoned')).to_sql_conditions()
+
+        assert where == "(commodity_types ILIKE $1 OR commodity_types ILIKE $2)"
+        assert params == ['%class 2%', '%cartoned%']
+
+    def test_empty_tuples_are_skipped(self):
+        """Test fields set to empty tuples add no condition."""
+        assert FilterCriteria(table_numbers=(), figure_numbers=('Figure 4',)).to_sql_conditions() == (
+            "figure_number IN ($1)", ['Figure 4']
+        )
+
+    def test_clause_is_cached_per_shape(self):
+        """Test criteria with the same shape share one clause."""
+        first, _ = FilterCriteria(asrs_type=('shuttle',)).to_sql_conditions()
+        second, _ = FilterCriteria(asrs_type=('top_loading',)).to_sql_conditions()
+
+        assert first is second
+        assert _where_clause.cache_info().hits > 0
+
+    def test_param_offset_shifts_placeholders(self):
+        """Test placeholders start after the preceding parameters."""
+        where, params = FilterCriteria(asrs_type=('shuttle',), spacing_range=(5.0, 10.0)).to_sql_conditions(param_offset=2)
+
+        assert where == "asrs_type IN ($3) AND max_spacing_ft BETWEEN $4 AND $5"
+        assert params == ['shuttle', 5.0, 10.0]
+
+    @pytest.mark.parametrize("query", [
+        "Shuttle ASRS with open-top containers, 30 ft ceiling height, see Table 14",
+        "What does Figure 4 show for Class 2 commodities?",
+        "Compare tables and figures for 4 ft rack depth",
+    ])
+    def test_vector_search_placeholders_match_params(self, query):
+        """Test filter parameters follow the embedding and match count."""
+        filters = extract_metadata_filters(query)
+        sql, params = filters.to_vector_search_sql()
+        assert set(_placeholders(sql)) == set(range(1, len(params) + 3))
+
+    def test_batch_vector_search_placeholders_match_params(self):
+        """Test the batched statement numbers its parameters like the single one."""
+        filters = extract_metadata_filters("Shuttle ASRS with open-top containers, see Table 14")
+        sql, params = filters.to_batch_vector_search_sql()
+
+        assert set(_placeholders(sql)) == set(range(1, len(params) + 3))
+        assert params == filters.to_vector_search_sql()[1]
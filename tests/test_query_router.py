@@ -0,0 +1,106 @@
+"""Test query routing and pre-retrieval triage."""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from rag_agent.core.query_router import analyze_query, fast_route, route_query
+from rag_agent.tools import fm_global_tools_enhanced
+
+
+# Valid FM Global questions with no word from FM_GLOBAL_VOCABULARY
+OUT_OF_VOCABULARY_QUERIES = [
+    "What seismic bracing is required?",
+    "What are the hazards of lithium-ion batteries in warehouses?",
+    "Do I need roof vents?",
+    "How much water supply do I need?",
+    "What about idle pallets?",
+]
+
+
+def _search_context():
+    """Create a minimal run context for the search tool."""
+    return SimpleNamespace(deps=SimpleNamespace(settings=SimpleNamespace(default_match_count=10)))
+
+
+class TestFastRoute:
+    """Test the cheap greeting / vocabulary triage."""
+
+    @pytest.mark.parametrize("query", ["hi", "Hello there!", "Thanks so much!", "good morning", "bye"])
+    def test_greetings(self, query):
+        """Test social messages are recognized as greetings."""
+        assert fast_route(query) == "greeting"
+
+    @pytest.mark.parametrize("query", [
+        "What sprinkler spacing is required for ASRS?",
+        "ESFR K-25 at 40 ft",
+        "Is Table 14 applicable to open-top containers?",
+        "hello, what is the ceiling height limit?",
+    ])
+    def test_domain_queries_search(self, query):
+        """Test queries with FM Global vocabulary or numbers route to search."""
+        assert fast_route(query) == "search"
+
+    @pytest.mark.parametrize("query", OUT_OF_VOCABULARY_QUERIES)
+    def test_out_of_vocabulary_is_only_a_hint(self, query):
+        """Test out-of-vocabulary questions are flagged but not greetings."""
+        assert fast_route(query) == "off_topic"
+
+
+class TestRouterCache:
+    """Test cached routing hands each caller independent results."""
+
+    def test_route_query_params_are_independent(self):
+        """Test mutating nested params does not leak into later calls."""
+        query = "What does Table 14 say about ESFR?"
+        _, params = route_query(query)
+        params['filters']['references'].append("Table 99")
+        params['filters']['extra'] = True
+
+        _, params = route_query(query)
+        assert params['filters'] == {'references': ['Table 14']}
+
+    def test_analyze_query_is_independent(self):
+        """Test mutating nested analysis does not leak into later calls."""
+        query = "What does Table 14 say about ESFR?"
+        analysis = analyze_query(query)
+        analysis['extracted_references'].clear()
+        analysis['domain_entities']['sprinkler'].append("cmsa")
+
+        analysis = analyze_query(query)
+        assert analysis['extracted_references'] == ['Table 14']
+        assert analysis['domain_entities'] == {'sprinkler': ['esfr']}
+
+
+class TestSearchTriage:
+    """Test how the search tool acts on fast_route."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("query", OUT_OF_VOCABULARY_QUERIES + ["What is the weather today?"])
+    async def test_off_topic_still_searches(self, query):
+        """Test off_topic queries still run retrieval."""
+        with patch.object(fm_global_tools_enhanced, "_semantic_search_internal",
+                          AsyncMock(return_value=[])) as search:
+            result = await fm_global_tools_enhanced.intelligent_fm_global_search(
+                _search_context(), query,
+                force_strategy="semantic",
+                use_query_expansion=False,
+                use_reranking=False,
+                use_metadata_filter=False
+            )
+
+        search.assert_awaited_once()
+        assert result['strategy_used'] == "semantic"
+
+    @pytest.mark.asyncio
+    async def test_greeting_skips_retrieval(self):
+        """Test greetings return no results without searching."""
+        with patch.object(fm_global_tools_enhanced, "_semantic_search_internal",
+                          AsyncMock(return_value=[])) as search:
+            result = await fm_global_tools_enhanced.intelligent_fm_global_search(
+                _search_context(), "Thanks!", force_strategy="semantic"
+            )
+
+        search.assert_not_awaited()
+        assert result['strategy_used'] == "greeting"
+        assert result['results'] == []
@@ -0,0 +1,43 @@
+"""Test request metrics collection."""
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from rag_agent.api.request_metrics import MetricsMiddleware, RequestMetrics, UNMATCHED_PATH
+
+
+def _client():
+    """Create an app with one agent route and the metrics middleware."""
+    router = APIRouter(prefix="/api/fm-global")
+
+    @router.get("/sessions/{session_id}")
+    async def get_session(session_id: str):
+        return {"session_id": session_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(MetricsMiddleware)
+    app.state.metrics = RequestMetrics()
+    return app, TestClient(app)
+
+
+class TestRequestMetrics:
+    """Test requests are counted by route template."""
+
+    def test_counts_by_route_template(self):
+        """Test distinct URLs for one route share a counter."""
+        app, client = _client()
+        client.get("/api/fm-global/sessions/a")
+        client.get("/api/fm-global/sessions/b")
+
+        assert app.state.metrics.path_counts == {"/api/fm-global/sessions/{session_id}": 2}
+        assert app.state.metrics.agent_usage()["fm_global"]["requests"] == 2
+
+    def test_unmatched_paths_share_one_key(self):
+        """Test unknown URLs cannot grow the counter."""
+        app, client = _client()
+        for i in range(5):
+            assert client.get(f"/scan/{i}").status_code == 404
+
+        assert app.state.metrics.path_counts == {UNMATCHED_PATH: 5}
+        assert app.state.metrics.total_requests == 5